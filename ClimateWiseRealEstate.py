@@ -2,8 +2,18 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
-import plotly.graph_objects as go
-from datetime import datetime, timedelta
+import time
+import os
+from comparison import MAX_COMPARE_CITIES, compare_locations, comparison_table, create_price_band_chart
+from data_store import SharedDataset
+from data_versions import DataVersionManager
+from disaster_index import DisasterAreaIndex, load_crosswalk, state_code
+from risk_assessment import CLIMATE_RISK_WEIGHTS, RiskAssessment
+from scenarios import ScenarioModel
+from scoring import (COLORS, WEATHER_RISK_CAPS, analyze_price, analyze_weather_risk, create_price_chart,
+                     get_investment_recommendation)
+from screening import ScreeningEngine, load_city_metrics
+from timeseries_store import CityTimeSeriesStore
 
 # Set page config first
 st.set_page_config(
@@ -13,77 +23,91 @@ st.set_page_config(
     initial_sidebar_state="collapsed"
 )
 
-# Professional color palette
-COLORS = {
-    'navy': '#1a365d',
-    'blue': '#2563eb',
-    'indigo': '#4f46e5',
-    'green': '#059669',
-    'emerald': '#10b981',
-    'red': '#dc2626',
-    'orange': '#ea580c',
-    'gray': '#4b5563',
-    'lightgray': '#e5e7eb',
-    'white': '#ffffff',
-    'black': '#111827'
-}
+# Fingerprints of the input files, shared by every session. Cached results
+# below are keyed by data version, so a refresh of one input rebuilds only
+# what depends on it, and only for the states that changed.
+@st.cache_resource
+def load_data_versions():
+    return DataVersionManager()
+
+# Data version this session's results are based on (set by sync_data_version)
+def current_data_version():
+    return st.session_state.get('data_version')
+
+# Poll the inputs once per full rerun and drop this session's cached
+# analyses for states whose data changed since they were computed
+def sync_data_version():
+    versions = load_data_versions()
+    versions.poll()
+    previous = current_data_version()
+    if previous != versions.version:
+        changed = versions.changed_since(previous) if previous is not None else set()
+        for cache_name in ['analysis_cache', 'comparison_cache']:
+            cache = st.session_state.get(cache_name, {})
+            for key in list(cache):
+                locations = key if cache_name == 'comparison_cache' else [key]
+                if changed is None or any(state_code(state) in changed for state, _ in locations):
+                    del cache[key]
+        st.session_state.data_version = versions.version
+    return versions.version
 
 # Load data function - MOVED BEFORE ANY USE
-@st.cache_data
-def load_location_data():
+# cache_resource hands every session the same memory-mapped dataset instead
+# of the per-session DataFrame copies cache_data would make
+@st.cache_resource(max_entries=2)
+def load_location_data(data_version):
     try:
-        # Load your actual data
-        df = pd.read_csv('filled_redfin_noaa_data.csv')
-        # Ensure columns are properly named
-        df['STATE'] = df['STATE'].str.upper().str.strip()
-        df['CITY'] = df['CITY'].str.title().str.strip()
-        return df
+        return SharedDataset.from_csv('filled_redfin_noaa_data.csv')
     except Exception as e:
         st.error(f"Error loading data: {e}")
         return None
 
+# Per-city numeric history, memory-mapped; analyses read zero-copy slices
+@st.cache_resource(max_entries=2)
+def load_timeseries_store(data_version):
+    return CityTimeSeriesStore.from_dataset(load_location_data(data_version))
+
+# Indexed per-city metrics for screening across all cities
+@st.cache_resource(max_entries=2)
+def load_screening_engine(data_version):
+    return ScreeningEngine(load_city_metrics(load_timeseries_store(data_version), load_data_versions()))
+
+# FEMA-based climate risk; None when neither the area index nor FEMA data is available
+@st.cache_resource(max_entries=2)
+def load_risk_assessment(data_version):
+    area_index = None
+    if os.path.exists('disaster_area_index.pkl'):
+        # None when the pickle is in an older format
+        area_index = DisasterAreaIndex.load('disaster_area_index.pkl')
+    if area_index is not None:
+        # An index saved without a version (or with one too old to diff
+        # against) gets a full rebuild
+        changed = load_data_versions().changed_since(getattr(area_index, 'data_version', None), ['fema'])
+    else:
+        changed = None
+    if changed != set() and os.path.exists('fema_cleaned.csv'):
+        fema_df = pd.read_csv('fema_cleaned.csv')
+        cities = load_timeseries_store(data_version).cities[['STATE', 'CITY']]
+        if changed is None:
+            area_index = DisasterAreaIndex.build(fema_df, cities, load_crosswalk())
+        else:
+            area_index.update(fema_df, cities, changed, load_crosswalk())
+        area_index.data_version = data_version
+        area_index.save('disaster_area_index.pkl')
+    if area_index is None:
+        return None
+    return RiskAssessment(None, None, area_index=area_index)
+
+# Cached per-city component matrices for what-if reweighting
+@st.cache_resource(max_entries=2)
+def load_scenario_model(data_version):
+    return ScenarioModel.from_store(load_timeseries_store(data_version), load_risk_assessment(data_version),
+                                    load_data_versions())
+
 # Function to get price analysis from actual data
 def get_price_analysis(state, city):
     try:
-        # Load your actual data
-        df = pd.read_csv('filled_redfin_noaa_data.csv')
-        location_data = df[(df['STATE'].str.upper() == state.upper()) & 
-                          (df['CITY'].str.title() == city.title())].copy()
-        
-        if location_data.empty:
-            return None
-        
-        # Take only the 10 most recent entries for this location
-        location_data['PERIOD_BEGIN'] = pd.to_datetime(location_data['PERIOD_BEGIN'])
-        location_data = location_data.sort_values('PERIOD_BEGIN', ascending=False).head(10)
-        recent_data = location_data.iloc[0]
-        
-        # Current price
-        current_price = recent_data['MEDIAN_SALE_PRICE']
-        
-        # Simple prediction based on historical data for this location
-        if len(location_data) > 1:
-            # Calculate average growth rate from available data
-            price_changes = location_data['MEDIAN_SALE_PRICE'].pct_change().dropna()
-            if not price_changes.empty:
-                annual_growth_rate = price_changes.mean() * 12
-            else:
-                annual_growth_rate = 0.03  # Default 3% growth
-        else:
-            annual_growth_rate = 0.03  # Default 3% growth
-        
-        # Predict price for 12 months out
-        predicted_price = current_price * (1 + annual_growth_rate)
-        
-        # Calculate percentage change
-        price_change = ((predicted_price - current_price) / current_price) * 100
-        
-        return {
-            'current_price': current_price,
-            'predicted_price': predicted_price,
-            'price_change': price_change,
-            'data_date': recent_data['PERIOD_BEGIN']
-        }
+        return analyze_price(load_timeseries_store(current_data_version()).history(state, city))
     except Exception as e:
         st.error(f"Error processing data: {e}")
         return None
@@ -91,212 +115,60 @@ def get_price_analysis(state, city):
 # Function to get weather risk assessment
 def get_weather_risk(state, city):
     try:
-        df = pd.read_csv('filled_redfin_noaa_data.csv')
-        location_data = df[(df['STATE'].str.upper() == state.upper()) & 
-                          (df['CITY'].str.title() == city.title())].copy()
-        
-        if location_data.empty:
-            return None
-        
-        # Get the most recent weather data
-        recent_data = location_data.iloc[-1]
-        
-        # Calculate weather risk score
-        risk_factors = {
-            'precipitation': recent_data.get('precipitation', 0),
-            # With one of these options:
-			'avg_temp': recent_data.get('avg_temp', 0),  # Average temperature
-			'humidity': recent_data.get('humidity', 0),   # Humidity level
-			'wind_speed': recent_data.get('wind_speed', 0), # Wind speed
-			'pressure': recent_data.get('pressure', 0),    # Atmospheric pressure
-            'natural_disaster_score': recent_data.get('natural_disaster_score', 0),
-            'fema_disaster_count': recent_data.get('fema_disaster_count', 0),
-            'avg_temp': recent_data.get('avg_temp', 0),
-            'humidity': recent_data.get('humidity', 0),
-            'wind_speed': recent_data.get('wind_speed', 0)
-        }
-        
-        # Calculate overall risk score (0-100)
-        precipitation_risk = min(risk_factors['precipitation'] / 1500 * 20, 20)
-        humidity_risk = min(risk_factors['humidity'] / 100 * 30, 30)
-        natural_disaster_risk = min(risk_factors['natural_disaster_score'] / 30 * 20, 20)
-        fema_risk = min(risk_factors['fema_disaster_count'] / 50 * 15, 15)
-        climate_risk = min(15 * (1 - (abs(risk_factors['avg_temp'] - 70) / 40)), 15)
-        
-        overall_risk = precipitation_risk + humidity_risk + natural_disaster_risk + fema_risk + climate_risk
-        
-        return {
-            'precipitation': risk_factors['precipitation'],
-            'natural_disaster_score': risk_factors['natural_disaster_score'],
-            'fema_disaster_count': risk_factors['fema_disaster_count'],
-            'avg_temp': risk_factors['avg_temp'],
-            'humidity': risk_factors['humidity'],
-            'wind_speed': risk_factors['wind_speed'],
-            'overall_risk': overall_risk
-        }
+        return analyze_weather_risk(load_timeseries_store(current_data_version()).history(state, city))
     except Exception as e:
         st.error(f"Error analyzing weather risk: {e}")
         return None
 
-# Function to generate investment recommendation
-def get_investment_recommendation(price_analysis, weather_risk):
-    score = 0
-    factors = {}
-    
-    # Price trend analysis
-    if price_analysis['price_change'] > 5:
-        score += 40
-        factors['price_trend'] = "Excellent"
-    elif price_analysis['price_change'] > 0:
-        score += 20
-        factors['price_trend'] = "Good"
-    else:
-        score -= 10
-        factors['price_trend'] = "Declining"
-    
-    # Risk assessment
-    if weather_risk['overall_risk'] < 20:
-        score += 40
-        factors['weather_risk'] = "Low"
-    elif weather_risk['overall_risk'] < 40:
-        score += 20
-        factors['weather_risk'] = "Moderate"
-    elif weather_risk['overall_risk'] < 60:
-        score += 10
-        factors['weather_risk'] = "High"
-    else:
-        score -= 20
-        factors['weather_risk'] = "Very High"
-    
-    # Market conditions
-    if price_analysis['current_price'] > 500000:
-        score -= 5  # Premium markets may have limited growth
-    
-    # Normalize score to 0-100
-    score = max(0, min(100, score))
-    
-    # Generate recommendation
-    if score >= 70:
-        recommendation = "Strong Buy"
-        recommendation_color = COLORS['green']
-        recommendation_details = "Excellent investment opportunity"
-    elif score >= 50:
-        recommendation = "Buy"
-        recommendation_color = COLORS['emerald']
-        recommendation_details = "Good investment potential"
-    elif score >= 30:
-        recommendation = "Hold/Wait"
-        recommendation_color = COLORS['orange']
-        recommendation_details = "Monitor market conditions"
-    else:
-        recommendation = "Don't Invest"
-        recommendation_color = COLORS['red']
-        recommendation_details = "High risk, consider alternatives"
-    
-    return {
-        'score': score,
-        'recommendation': recommendation,
-        'recommendation_color': recommendation_color,
-        'recommendation_details': recommendation_details,
-        'factors': factors
-    }
-
-# Function to create professional price chart
-def create_price_chart(current_price, predicted_price):
-    current_date = datetime.now()
-    future_dates = [current_date + timedelta(days=30*i) for i in range(13)]
-    
-    # Create realistic price progression
-    price_progression = []
-    for i in range(13):
-        fluctuation = np.random.normal(0, 0.01)
-        if i == 0:
-            price_progression.append(current_price)
-        elif i == 12:
-            price_progression.append(predicted_price)
-        else:
-            linear_interpolation = current_price + (predicted_price - current_price) * (i / 12)
-            price_progression.append(linear_interpolation * (1 + fluctuation))
-    
-    fig = go.Figure()
-    
-    # Main price trend line
-    fig.add_trace(go.Scatter(
-        x=future_dates,
-        y=price_progression,
-        mode='lines+markers',
-        name='Price Prediction',
-        line=dict(color=COLORS['green'], width=3),
-        marker=dict(size=8, color=COLORS['green']),
-        fill='tozeroy',
-        fillcolor='rgba(5, 150, 105, 0.1)'
-    ))
-    
-    # Key points
-    fig.add_trace(go.Scatter(
-        x=[future_dates[0], future_dates[-1]],
-        y=[current_price, predicted_price],
-        mode='markers+text',
-        name='Key Points',
-        marker=dict(size=14, color=[COLORS['blue'], COLORS['red']], 
-                   line=dict(width=2, color='white')),
-        text=[f'Current: ${current_price:,.0f}', f'Predicted: ${predicted_price:,.0f}'],
-        textposition='top center',
-        textfont=dict(size=12, color='#374151', family="Arial"),
-        showlegend=False
-    ))
-    
-    fig.update_layout(
-        title={
-            'text': '12-Month Price Prediction',
-            'x': 0.5,
-            'xanchor': 'center',
-            'font': {'size': 24, 'family': 'Arial', 'color': '#1a365d'}
-        },
-        xaxis_title='Date',
-        yaxis_title='Price ($)',
-        plot_bgcolor='white',
-        paper_bgcolor='white',
-        hovermode='x unified',
-        height=400,
-        yaxis_tickformat='$,.0f',
-        xaxis=dict(
-            showgrid=True,
-            gridcolor='#e5e7eb',
-            zerolinecolor='#e5e7eb'
-        ),
-        yaxis=dict(
-            showgrid=True,
-            gridcolor='#e5e7eb',
-            zerolinecolor='#e5e7eb'
-        ),
-        font=dict(
-            family="Arial",
-            size=12,
-            color='#4b5563'
-        ),
-        margin=dict(l=60, r=20, t=60, b=40),
-        legend=dict(
-            orientation="h",
-            yanchor="bottom",
-            y=1.02,
-            xanchor="right",
-            x=1
-        )
-    )
-    
-    return fig
+# Analysis results for this session, keyed by location, so re-opening a
+# city that was already analyzed costs no recomputation
+def get_location_analysis(state, city):
+    cache = st.session_state.setdefault('analysis_cache', {})
+    if (state, city) not in cache:
+        analysis = get_price_analysis(state, city)
+        if analysis is None:
+            return None
+        weather_risk = get_weather_risk(state, city)
+        cache[(state, city)] = {
+            'data_version': current_data_version(),
+            'analysis': analysis,
+            'price_chart': create_price_chart(analysis['current_price'], analysis['predicted_price']),
+            'weather_risk': weather_risk,
+            'recommendation': get_investment_recommendation(analysis, weather_risk) if weather_risk else None
+        }
+    return cache[(state, city)]
+
+# Comparison results for this session, keyed by the selected locations
+def get_comparison(locations):
+    cache = st.session_state.setdefault('comparison_cache', {})
+    key = tuple(locations)
+    if key not in cache:
+        results = compare_locations(load_timeseries_store(current_data_version()), locations,
+                                    load_risk_assessment(current_data_version()))
+        risk_results = [result for result in results if result['climate_risk']]
+        cache[key] = {
+            'data_version': current_data_version(),
+            'results': results,
+            'table': comparison_table(results),
+            'price_band_chart': create_price_band_chart(results),
+            'risk_chart': load_risk_assessment(current_data_version()).create_risk_visualization(
+                [result['climate_risk'] for result in risk_results],
+                names=[f"{result['CITY']}, {result['STATE']}" for result in risk_results]
+            ) if risk_results else None
+        }
+    return cache[key]
 
 # Main function to display price analysis
 def display_price_analysis():
-    analysis = get_price_analysis(
+    results = get_location_analysis(
         st.session_state.selected_state, 
         st.session_state.selected_city
     )
     
-    if analysis is None:
+    if results is None:
         st.error("Could not find data for the selected location.")
         return
+    analysis = results['analysis']
     
     st.markdown("""
     <div class="price-chart-container">
@@ -308,7 +180,7 @@ def display_price_analysis():
     st.markdown(f"""
     <div style="background: white; border: 1px solid #e5e7eb; padding: 1.5rem; border-radius: 8px; margin-bottom: 1.5rem; border-left: 4px solid #2563eb;">
         <h3 style="color: #1a365d; margin-bottom: 0.5rem; font-size: 1.5rem; font-weight: 600;">Location: {st.session_state.selected_city}, {st.session_state.selected_state}</h3>
-        <p style="color: #4b5563; margin: 0;">Data as of: {analysis['data_date'].strftime('%B %Y')}</p>
+        <p style="color: #4b5563; margin: 0;">Data as of: {analysis['data_date'].strftime('%B %Y')} · Data version: {results['data_version']}</p>
     </div>
     """, unsafe_allow_html=True)
     
@@ -351,16 +223,13 @@ def display_price_analysis():
     
     # Display price chart
     st.markdown('<div class="price-chart-container">', unsafe_allow_html=True)
-    fig = create_price_chart(analysis['current_price'], analysis['predicted_price'])
-    st.plotly_chart(fig, use_container_width=True)
+    st.plotly_chart(results['price_chart'], use_container_width=True)
     st.markdown('</div>', unsafe_allow_html=True)
     
-    # Get weather risk analysis
-    weather_risk = get_weather_risk(st.session_state.selected_state, st.session_state.selected_city)
+    weather_risk = results['weather_risk']
     
     if weather_risk:
-        # Get investment recommendation
-        recommendation = get_investment_recommendation(analysis, weather_risk)
+        recommendation = results['recommendation']
         
         # Display investment recommendation
         st.markdown(f"""
@@ -789,10 +658,11 @@ with col3:
     </div>
     """, unsafe_allow_html=True)
 
-# Load data
-df = load_location_data()
-
-if df is not None:
+# Selection and analysis run as a fragment: changing a selectbox or clicking
+# the button reruns only this section, not the CSS, header, process steps,
+# footer and news ticker around it
+@st.fragment
+def location_analysis_section(dataset):
     # Selection section
     st.markdown("""
     <div class="selection-card">
@@ -804,7 +674,7 @@ if df is not None:
     col1, col2 = st.columns(2)
     
     with col1:
-        states = sorted(df['STATE'].dropna().unique().tolist())
+        states = dataset.states()
         selected_state = st.selectbox(
             "Select State",
             options=["Select a state..."] + states,
@@ -813,7 +683,7 @@ if df is not None:
     
     with col2:
         if selected_state and selected_state != "Select a state...":
-            cities = sorted(df[df['STATE'] == selected_state]['CITY'].dropna().unique().tolist())
+            cities = dataset.cities(selected_state)
             selected_city = st.selectbox(
                 "Select City",
                 options=["Select a city..."] + cities,
@@ -847,6 +717,157 @@ if df is not None:
     if 'analysis_generated' in st.session_state and st.session_state.analysis_generated:
         st.markdown("<div style='margin-top: 3rem;'></div>", unsafe_allow_html=True)
         display_price_analysis()
+
+# Side-by-side comparison of several cities from one batch lookup
+@st.fragment
+def comparison_section(dataset):
+    st.markdown(f"""
+    <div class="selection-card">
+        <h2>Compare Cities</h2>
+        <p>Pick up to {MAX_COMPARE_CITIES} cities to compare prices, weather risk and climate risk side by side.</p>
+    </div>
+    """, unsafe_allow_html=True)
+
+    locations = {
+        f"{city}, {state}": (state, city)
+        for state in dataset.states() for city in dataset.cities(state)
+    }
+    selected = st.multiselect(
+        "Cities to Compare",
+        options=list(locations),
+        max_selections=MAX_COMPARE_CITIES,
+        key="compare_cities"
+    )
+    if len(selected) < 2:
+        st.caption("Select at least two cities to compare.")
+        return
+
+    start = time.perf_counter()
+    comparison = get_comparison([locations[label] for label in selected])
+    elapsed = (time.perf_counter() - start) * 1000
+    st.caption(f"Compared {len(comparison['results'])} cities in {elapsed:.0f} ms · data version {comparison['data_version']}")
+
+    st.dataframe(comparison['table'], use_container_width=True, hide_index=True)
+    col1, col2 = st.columns(2)
+    with col1:
+        st.plotly_chart(comparison['price_band_chart'], use_container_width=True)
+    with col2:
+        if comparison['risk_chart'] is not None:
+            st.plotly_chart(comparison['risk_chart'], use_container_width=True)
+
+# Market screening across every city, also a fragment so filter changes
+# only rerun the screening results
+@st.fragment
+def market_screening_section(dataset):
+    st.markdown("""
+    <div class="selection-card">
+        <h2>Screen Markets</h2>
+        <p>Filter every city by risk, price trend and price level to find markets worth a closer look.</p>
+    </div>
+    """, unsafe_allow_html=True)
+
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        screen_states = st.multiselect("States", options=dataset.states(), key="screen_states")
+    with col2:
+        max_risk = st.slider("Max Weather Risk", 0, 100, 100, key="screen_max_risk")
+    with col3:
+        min_change = st.number_input("Min Price Change (%)", value=-100.0, step=1.0, key="screen_min_change")
+    with col4:
+        max_price = st.number_input("Max Current Price ($)", value=0, step=50000, key="screen_max_price",
+                                    help="0 means no limit")
+
+    col1, col2 = st.columns(2)
+    with col1:
+        sort_by = st.selectbox(
+            "Sort By",
+            options=['investment_score', 'price_change', 'overall_risk', 'current_price'],
+            key="screen_sort"
+        )
+    with col2:
+        page = st.number_input("Page", min_value=1, value=1, step=1, key="screen_page")
+
+    # Filters at their defaults are left out entirely, so the unfiltered
+    # view also keeps cities with NaN metrics or changes below -100%
+    filters = []
+    if max_risk < 100:
+        filters.append(('overall_risk', '<=', max_risk))
+    if min_change != -100.0:
+        filters.append(('price_change', '>=', min_change))
+    if screen_states:
+        filters.append(('STATE', 'in', screen_states))
+    if max_price:
+        filters.append(('current_price', '<=', max_price))
+
+    start = time.perf_counter()
+    page_size = 20
+    result = load_screening_engine(current_data_version()).query(
+        filters, sort_by=sort_by, descending=sort_by != 'overall_risk',
+        limit=page_size, offset=(page - 1) * page_size
+    )
+    elapsed = (time.perf_counter() - start) * 1000
+
+    st.caption(f"{result['total']:,} cities match · query took {elapsed:.1f} ms · data version {result['data_version']}")
+    st.dataframe(result['rows'], use_container_width=True, hide_index=True)
+
+# What-if reweighting: every city is rescored from the cached component
+# matrices, so moving a slider only reruns this section
+@st.fragment
+def scenario_section():
+    st.markdown("""
+    <div class="selection-card">
+        <h2>What-If Scenarios</h2>
+        <p>Change how much each risk factor counts and see which cities move between tiers.</p>
+    </div>
+    """, unsafe_allow_html=True)
+
+    model = load_scenario_model(current_data_version())
+
+    st.markdown("**Weather risk caps** (maximum points per factor)")
+    cap_columns = st.columns(len(WEATHER_RISK_CAPS))
+    caps = {}
+    for column, (name, default) in zip(cap_columns, WEATHER_RISK_CAPS.items()):
+        with column:
+            caps[name] = st.slider(name.replace('_', ' ').title(), 0, 50, default, key=f"scenario_cap_{name}")
+
+    weights = None
+    if model.has_climate:
+        st.markdown("**Climate risk weights**")
+        weight_columns = st.columns(len(CLIMATE_RISK_WEIGHTS))
+        weights = {}
+        for column, (name, default) in zip(weight_columns, CLIMATE_RISK_WEIGHTS.items()):
+            with column:
+                weights[name] = st.slider(name.title(), 0.0, 1.0, default, 0.05, key=f"scenario_weight_{name}")
+
+    start = time.perf_counter()
+    result = model.rescore(caps, weights)
+    elapsed = (time.perf_counter() - start) * 1000
+    st.caption(f"Rescored {model.size:,} cities in {elapsed:.1f} ms · "
+               f"{int(result['recommendation_changed'].sum()):,} recommendations changed · "
+               f"data version {result.attrs['data_version']}")
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.markdown("**Recommendation: baseline (rows) vs scenario (columns)**")
+        st.dataframe(ScenarioModel.tier_changes(result), use_container_width=True)
+    if model.has_climate:
+        with col2:
+            st.markdown("**Climate risk level: baseline (rows) vs scenario (columns)**")
+            st.dataframe(ScenarioModel.tier_changes(result, 'risk_level'), use_container_width=True)
+
+    changed = result['recommendation_changed']
+    if model.has_climate:
+        changed = changed | result['risk_level_changed']
+    st.dataframe(result[changed].head(200), use_container_width=True, hide_index=True)
+
+# Load data
+dataset = load_location_data(sync_data_version())
+
+if dataset is not None:
+    location_analysis_section(dataset)
+    comparison_section(dataset)
+    market_screening_section(dataset)
+    scenario_section()
 else:
     st.markdown("""
     <div style="text-align: center; padding: 2rem; background: #fef2f2; border-radius: 8px; border: 1px solid #fca5a5; margin: 1rem 0;">
@@ -0,0 +1,129 @@
+"""
+Side-by-side comparison of several cities.
+
+All selected locations are resolved in one CityTimeSeriesStore.histories()
+call. Price analysis, weather risk, recommendation and (when a
+RiskAssessment is available) climate risk are then computed for each one
+from the same zero-copy views, and the results are laid out as a table,
+a combined risk radar and a price-band chart.
+"""
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+from disaster_index import state_code
+from risk_assessment import COMPARISON_COLORS
+from scoring import COLORS, analyze_price, analyze_weather_risk, get_investment_recommendation
+
+MAX_COMPARE_CITIES = 5
+PRICE_BAND_MONTHS = 12
+
+
+def compare_locations(store, locations, risk_assessment=None):
+    """
+    Analyze several (state, city) pairs from one batch store lookup.
+
+    Returns:
+        List of dictionaries, one per location found, with STATE, CITY,
+        'analysis', 'weather_risk', 'recommendation', 'climate_risk'
+        (None without a RiskAssessment) and 'price_history' (recent dates
+        and median sale prices for the price band)
+    """
+    results = []
+    for (state, city), history in store.histories(locations).items():
+        analysis = analyze_price(history)
+        if analysis is None:
+            continue
+        weather_risk = analyze_weather_risk(history)
+        recent = np.argsort(history['PERIOD_BEGIN'], kind='stable')[-PRICE_BAND_MONTHS:]
+        results.append({
+            'STATE': state,
+            'CITY': city,
+            'analysis': analysis,
+            'weather_risk': weather_risk,
+            'recommendation': get_investment_recommendation(analysis, weather_risk) if weather_risk else None,
+            'climate_risk': risk_assessment.get_climate_risk_score(state_code(state), city) if risk_assessment else None,
+            'price_history': {
+                'dates': history['PERIOD_BEGIN'][recent],
+                'prices': history['MEDIAN_SALE_PRICE'][recent].astype(float)
+            }
+        })
+    return results
+
+
+def comparison_table(results):
+    """One row of headline numbers per compared location."""
+    rows = []
+    for result in results:
+        row = {
+            'Location': f"{result['CITY']}, {result['STATE']}",
+            'Current Price': result['analysis']['current_price'],
+            'Predicted Price': round(result['analysis']['predicted_price']),
+            'Price Change (%)': round(result['analysis']['price_change'], 1)
+        }
+        if result['weather_risk']:
+            row['Weather Risk'] = round(result['weather_risk']['overall_risk'], 1)
+            row['Investment Score'] = result['recommendation']['score']
+            row['Recommendation'] = result['recommendation']['recommendation']
+        if result['climate_risk']:
+            row['Climate Risk'] = result['climate_risk']['overall_score']
+            row['Risk Level'] = result['climate_risk']['recommendation']['level']
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def create_price_band_chart(results):
+    """
+    Recent price range (min-max over the last PRICE_BAND_MONTHS months) per
+    location, with the current price and the 12-month prediction marked.
+    """
+    labels = [f"{result['CITY']}, {result['STATE']}" for result in results]
+    fig = go.Figure()
+
+    for i, (label, result) in enumerate(zip(labels, results)):
+        prices = result['price_history']['prices']
+        prices = prices[~np.isnan(prices)]
+        if prices.size == 0:
+            continue
+        color = COMPARISON_COLORS[i % len(COMPARISON_COLORS)]
+        fig.add_trace(go.Bar(
+            x=[label],
+            y=[prices.max() - prices.min()],
+            base=[prices.min()],
+            name=label,
+            marker_color=color,
+            opacity=0.35,
+            hovertemplate=f'{label}<br>Range: ${prices.min():,.0f} - ${prices.max():,.0f}<extra></extra>',
+            showlegend=False
+        ))
+
+    fig.add_trace(go.Scatter(
+        x=labels,
+        y=[result['analysis']['current_price'] for result in results],
+        mode='markers',
+        name='Current Price',
+        marker=dict(color=COLORS['navy'], size=12, symbol='circle'),
+        hovertemplate='Current: $%{y:,.0f}<extra></extra>'
+    ))
+    fig.add_trace(go.Scatter(
+        x=labels,
+        y=[result['analysis']['predicted_price'] for result in results],
+        mode='markers',
+        name='Predicted (12 months)',
+        marker=dict(color=COLORS['green'], size=12, symbol='diamond'),
+        hovertemplate='Predicted: $%{y:,.0f}<extra></extra>'
+    ))
+
+    fig.update_layout(
+        title=dict(
+            text=f'Price Band (last {PRICE_BAND_MONTHS} months) and Forecast',
+            font=dict(size=20, color=COLORS['navy'])
+        ),
+        yaxis=dict(title='Price ($)', tickformat='$,.0f', gridcolor=COLORS['lightgray']),
+        plot_bgcolor='white',
+        paper_bgcolor='white',
+        height=450,
+        barmode='overlay',
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1)
+    )
+    return fig
@@ -0,0 +1,95 @@
+import json
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+
+OFFSETS_KEY = b'climatewise.city_offsets'
+
+
+def normalize_location(state, city):
+    return str(state).upper().strip(), str(city).title().strip()
+
+
+class SharedDataset:
+    """
+    Read-only, memory-mapped copy of the merged Redfin/NOAA dataset.
+
+    The CSV is converted once to an Arrow IPC file sorted by STATE and CITY
+    (stable, so each city's rows keep their file order), with each city's
+    (start, length) row range stored in the file's schema metadata. Opening
+    the file memory-maps it: every session in a process shares the same
+    table through st.cache_resource, and separate server processes mapping
+    the same file share the OS page cache instead of holding private copies.
+    """
+
+    def __init__(self, arrow_path):
+        self.arrow_path = arrow_path
+        self._source = pa.memory_map(arrow_path, 'r')
+        self.table = pa.ipc.open_file(self._source).read_all()
+        offsets = json.loads(self.table.schema.metadata[OFFSETS_KEY])
+        self.offsets = {(state, city): (start, length) for state, city, start, length in offsets}
+        self._cities_by_state = {}
+        for state, city in self.offsets:
+            self._cities_by_state.setdefault(state, []).append(city)
+
+    @classmethod
+    def from_csv(cls, csv_path, arrow_path=None):
+        """Open the Arrow copy of `csv_path`, (re)building it if it is missing or stale."""
+        arrow_path = arrow_path or os.path.splitext(csv_path)[0] + '.arrow'
+        if not os.path.exists(arrow_path) or os.path.getmtime(arrow_path) < os.path.getmtime(csv_path):
+            cls.convert(csv_path, arrow_path)
+        return cls(arrow_path)
+
+    @staticmethod
+    def convert(csv_path, arrow_path):
+        table = pa_csv.read_csv(csv_path)
+        # Same normalisation load_location_data applied to the DataFrame
+        states = pc.utf8_upper(pc.utf8_trim_whitespace(table['STATE'].cast(pa.string())))
+        cities = pc.utf8_title(pc.utf8_trim_whitespace(table['CITY'].cast(pa.string())))
+        table = table.set_column(table.schema.get_field_index('STATE'), 'STATE', states)
+        table = table.set_column(table.schema.get_field_index('CITY'), 'CITY', cities)
+        table = table.filter(pc.and_(pc.is_valid(table['STATE']), pc.is_valid(table['CITY'])))
+        table = table.sort_by([('STATE', 'ascending'), ('CITY', 'ascending')])
+
+        keys = table.select(['STATE', 'CITY']).to_pandas()
+        boundaries = keys.ne(keys.shift()).any(axis=1).to_numpy().nonzero()[0].tolist() + [len(keys)]
+        offsets = [
+            [keys.at[start, 'STATE'], keys.at[start, 'CITY'], start, end - start]
+            for start, end in zip(boundaries[:-1], boundaries[1:])
+        ]
+
+        metadata = dict(table.schema.metadata or {})
+        metadata[OFFSETS_KEY] = json.dumps(offsets).encode()
+        table = table.replace_schema_metadata(metadata)
+
+        tmp_path = arrow_path + '.tmp'
+        with pa.OSFile(tmp_path, 'wb') as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(tmp_path, arrow_path)
+
+    def __len__(self):
+        return self.table.num_rows
+
+    def states(self):
+        return sorted(self._cities_by_state)
+
+    def cities(self, state):
+        return sorted(self._cities_by_state.get(str(state).upper().strip(), []))
+
+    def location_table(self, state, city):
+        """Zero-copy Arrow slice with every row for one city (None if unknown)."""
+        span = self.offsets.get(normalize_location(state, city))
+        if span is None:
+            return None
+        return self.table.slice(*span)
+
+    def location_frame(self, state, city):
+        """pandas DataFrame with every row for one city (empty if unknown)."""
+        location = self.location_table(state, city)
+        if location is None:
+            return pd.DataFrame(columns=self.table.column_names)
+        return location.to_pandas()
@@ -0,0 +1,203 @@
+"""
+Data-version tracking for the app's input files.
+
+Each input is fingerprinted with a sha256 of the whole file and one sha256
+per state over that state's rows, so a refresh can be narrowed down to the
+states whose rows actually changed. Fingerprints and a history of versions
+live in data_versions.json; polling only compares size and mtime, and
+re-hashes a file when those move.
+
+Caches use changed_since() to drop or recompute only the affected states;
+refresh_city_cache() does this for caches with one row per city:
+
+    versions = DataVersionManager()
+    versions.refresh()                                  # -> {'merged': {'TX'}} or {}
+    versions.changed_since(old_version, ['merged'])     # -> {'TX'}, or None for "everything"
+
+    python data_versions.py            # fingerprint inputs and print what changed
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from disaster_index import state_code
+
+# name -> (path, state column); state values may be full names or codes
+DATA_INPUTS = {
+    'merged': ('filled_redfin_noaa_data.csv', 'STATE'),
+    'fema': ('fema_cleaned.csv', 'state'),
+    'disaster_scores': ('City_Natural_Disaster_Score__0_30_realistic_.csv', 'STATE')
+}
+MANIFEST = 'data_versions.json'
+HISTORY_LENGTH = 50
+
+
+def fingerprint_file(path, state_column, chunksize=200000):
+    """
+    Content hash of `path` plus per-state partition hashes (keyed by
+    two-letter state code), read in chunks.
+    """
+    file_hash = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            file_hash.update(block)
+
+    state_hashes = {}
+    for chunk in pd.read_csv(path, dtype=str, keep_default_na=False, chunksize=chunksize):
+        column = next((c for c in chunk.columns if c.strip().lower() == state_column.lower()), None)
+        if column is None:
+            raise ValueError(f"{path} has no {state_column} column")
+        row_hashes = pd.util.hash_pandas_object(chunk, index=False).to_numpy()
+        codes = chunk[column].map(state_code)
+        for code, rows in codes.groupby(codes, sort=False).indices.items():
+            state_hashes.setdefault(code, hashlib.sha256()).update(row_hashes[rows].tobytes())
+
+    stat = os.stat(path)
+    return {
+        'sha256': file_hash.hexdigest(),
+        'size': stat.st_size,
+        'mtime': stat.st_mtime,
+        'states': {code: h.hexdigest() for code, h in sorted(state_hashes.items())}
+    }
+
+
+def changed_states(old, new):
+    """State codes whose partition hash differs between two fingerprints."""
+    old_states = old['states'] if old else {}
+    new_states = new['states'] if new else {}
+    return {code for code in set(old_states) | set(new_states) if old_states.get(code) != new_states.get(code)}
+
+
+def refresh_city_cache(cached, cached_version, versions, store, build, combine, inputs=None):
+    """
+    Bring a cache with one row per city up to the current data version.
+
+    build(states) computes rows for a set of state codes, or for every city
+    when given None. If `cached_version` can be diffed against the current
+    version, only the states changed in `inputs` are rebuilt, and
+    combine(cached, keep, fresh) joins them with the cached rows selected
+    by the boolean `keep` (unchanged state, city still in `store`).
+    Otherwise everything is rebuilt.
+    """
+    changed = None
+    if versions is not None and cached is not None and cached_version is not None:
+        changed = versions.changed_since(cached_version, inputs)
+    if changed is None:
+        return build(None)
+    known = set(store.offsets)
+    keep = np.array([
+        state_code(state) not in changed and (state, city) in known
+        for state, city in zip(cached['STATE'], cached['CITY'])
+    ], dtype=bool)
+    return combine(cached, keep, build(changed))
+
+
+class DataVersionManager:
+    """
+    Tracks the current data version and which states changed in each
+    version. Safe to share between Streamlit sessions (threads).
+    """
+
+    def __init__(self, inputs=None, manifest_path=MANIFEST, poll_interval=5):
+        self.inputs = inputs or DATA_INPUTS
+        self.manifest_path = manifest_path
+        self.poll_interval = poll_interval
+        self._lock = threading.Lock()
+        self._last_poll = 0
+        if os.path.exists(manifest_path):
+            with open(manifest_path) as f:
+                self.manifest = json.load(f)
+        else:
+            self.manifest = {'version': None, 'files': {}, 'history': []}
+        self.refresh()
+
+    @property
+    def version(self):
+        return self.manifest['version']
+
+    def _save(self):
+        tmp_path = self.manifest_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.manifest, f, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+
+    def refresh(self):
+        """
+        Re-fingerprint any input whose size or mtime moved.
+
+        Returns:
+            {input name: set of changed state codes} for inputs whose content
+            changed (empty if nothing did)
+        """
+        with self._lock:
+            self._last_poll = time.time()
+            changes = {}
+            touched = False
+            for name, (path, state_column) in self.inputs.items():
+                old = self.manifest['files'].get(name)
+                if not os.path.exists(path):
+                    if old is not None:
+                        changes[name] = changed_states(old, None)
+                        del self.manifest['files'][name]
+                    continue
+                stat = os.stat(path)
+                if old and old['size'] == stat.st_size and old['mtime'] == stat.st_mtime:
+                    continue
+                new = fingerprint_file(path, state_column)
+                self.manifest['files'][name] = new
+                touched = True
+                if old is None or old['sha256'] != new['sha256']:
+                    changes[name] = changed_states(old, new)
+
+            if changes or self.version is None:
+                digest = hashlib.sha256()
+                for name in sorted(self.manifest['files']):
+                    digest.update(f"{name}:{self.manifest['files'][name]['sha256']}".encode())
+                self.manifest['version'] = digest.hexdigest()[:12]
+                self.manifest['history'].append({
+                    'version': self.version,
+                    'time': datetime.now().isoformat(timespec='seconds'),
+                    'changes': {name: sorted(states) for name, states in changes.items()}
+                })
+                self.manifest['history'] = self.manifest['history'][-HISTORY_LENGTH:]
+            if changes or touched:
+                self._save()
+            return changes
+
+    def poll(self):
+        """refresh(), at most once per `poll_interval` seconds."""
+        if time.time() - self._last_poll < self.poll_interval:
+            return {}
+        return self.refresh()
+
+    def changed_since(self, version, inputs=None):
+        """
+        State codes changed in any of `inputs` (default: all) between
+        `version` and the current version. Returns None when `version` is
+        unknown (too old, or never recorded), meaning everything is stale.
+        """
+        if version == self.version:
+            return set()
+        versions = [entry['version'] for entry in self.manifest['history']]
+        if version is None or version not in versions:
+            return None
+        states = set()
+        for entry in self.manifest['history'][versions.index(version) + 1:]:
+            for name, codes in entry['changes'].items():
+                if inputs is None or name in inputs:
+                    states.update(codes)
+        return states
+
+
+if __name__ == '__main__':
+    manager = DataVersionManager()
+    latest = manager.manifest['history'][-1]
+    print(f"Data version {manager.version} (since {latest['time']})")
+    for name, codes in latest['changes'].items():
+        print(f"  {name}: {len(codes)} states changed ({', '.join(codes[:10])}{' ...' if len(codes) > 10 else ''})")
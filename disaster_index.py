@@ -0,0 +1,241 @@
+import argparse
+import os
+import pickle
+import re
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+STATE_CODES = {
+    'ALABAMA': 'AL', 'ALASKA': 'AK', 'ARIZONA': 'AZ', 'ARKANSAS': 'AR', 'CALIFORNIA': 'CA',
+    'COLORADO': 'CO', 'CONNECTICUT': 'CT', 'DELAWARE': 'DE', 'DISTRICT OF COLUMBIA': 'DC',
+    'FLORIDA': 'FL', 'GEORGIA': 'GA', 'HAWAII': 'HI', 'IDAHO': 'ID', 'ILLINOIS': 'IL',
+    'INDIANA': 'IN', 'IOWA': 'IA', 'KANSAS': 'KS', 'KENTUCKY': 'KY', 'LOUISIANA': 'LA',
+    'MAINE': 'ME', 'MARYLAND': 'MD', 'MASSACHUSETTS': 'MA', 'MICHIGAN': 'MI', 'MINNESOTA': 'MN',
+    'MISSISSIPPI': 'MS', 'MISSOURI': 'MO', 'MONTANA': 'MT', 'NEBRASKA': 'NE', 'NEVADA': 'NV',
+    'NEW HAMPSHIRE': 'NH', 'NEW JERSEY': 'NJ', 'NEW MEXICO': 'NM', 'NEW YORK': 'NY',
+    'NORTH CAROLINA': 'NC', 'NORTH DAKOTA': 'ND', 'OHIO': 'OH', 'OKLAHOMA': 'OK', 'OREGON': 'OR',
+    'PENNSYLVANIA': 'PA', 'PUERTO RICO': 'PR', 'RHODE ISLAND': 'RI', 'SOUTH CAROLINA': 'SC',
+    'SOUTH DAKOTA': 'SD', 'TENNESSEE': 'TN', 'TEXAS': 'TX', 'UTAH': 'UT', 'VERMONT': 'VT',
+    'VIRGINIA': 'VA', 'WASHINGTON': 'WA', 'WEST VIRGINIA': 'WV', 'WISCONSIN': 'WI', 'WYOMING': 'WY'
+}
+
+STATEWIDE_AREA = 'statewide'
+CROSSWALK_PATH = 'city_county_crosswalk.csv'
+
+# Bumped when the index layout changes so older pickles are rebuilt
+INDEX_FORMAT = 2
+
+# FEMA designations for cities rather than counties, e.g. 'Baltimore (City)',
+# 'Richmond (Independent City)'; these are keyed apart from same-named counties
+CITY_DESIGNATION = re.compile(r'\((independent )?city\)', re.IGNORECASE)
+CITY_AREA_SUFFIX = '(city)'
+
+
+def state_code(state):
+    """Return the two-letter code for a full state name or code."""
+    state = str(state).upper().strip()
+    return STATE_CODES.get(state, state)
+
+
+def normalize_area_name(name):
+    """
+    Reduce a FEMA designated area or city/county name to a comparable key,
+    e.g. 'Harris (County)' -> 'harris', 'St. Louis (City)' -> 'st louis'.
+    """
+    name = re.sub(r'\(.*?\)', '', str(name).lower())
+    name = re.sub(r'\b(county|parish|borough|city of|municipality|census area)\b', '', name)
+    name = re.sub(r'[^a-z0-9 ]', ' ', name)
+    return ' '.join(name.split())
+
+
+def area_key(name):
+    """
+    Index key for a FEMA designated area: 'Harris (County)' -> 'harris',
+    'Richmond (Independent City)' -> 'richmond (city)'.
+    """
+    key = normalize_area_name(name)
+    return f'{key} {CITY_AREA_SUFFIX}' if CITY_DESIGNATION.search(str(name)) else key
+
+
+def load_crosswalk(path=CROSSWALK_PATH):
+    """The STATE, CITY, COUNTY crosswalk, or None (with a warning from build) if missing."""
+    return pd.read_csv(path) if path and os.path.exists(path) else None
+
+
+class DisasterAreaIndex:
+    """
+    Precomputed lookup from each city to the FEMA designated area(s) that
+    cover it, plus a sorted array of declaration dates per area.
+
+    City disaster history then costs one binary search per area instead of
+    filtering every declaration in the state.
+
+    A city is mapped to:
+      - the county named for it in the crosswalk (STATE, CITY, COUNTY),
+      - a '(City)' or '(Independent City)' designation with its own name,
+      - its state's 'Statewide' designations, which apply everywhere.
+
+    City names are never matched to county names (Houston is in Harris
+    County, not Houston County), so without a crosswalk most cities only
+    get statewide declarations. Cities are keyed by two-letter state code.
+    """
+
+    def __init__(self):
+        self.city_areas = {}
+        self.area_dates = {}
+        self.area_types = {}
+        self.area_numbers = {}
+        self.data_version = None
+        self.format = INDEX_FORMAT
+
+    @classmethod
+    def build(cls, fema_df, cities_df, crosswalk_df=None):
+        index = cls()
+        fema = fema_df.copy()
+        fema.columns = fema.columns.str.strip().str.lower().str.replace(' ', '_')
+        fema['declarationdate'] = pd.to_datetime(fema['declarationdate'], errors='coerce', utc=True).dt.tz_localize(None)
+        fema = fema.dropna(subset=['declarationdate', 'state', 'designatedarea'])
+        fema['state'] = fema['state'].map(state_code)
+        fema['area_key'] = fema['designatedarea'].map(area_key)
+        fema = fema.sort_values('declarationdate')
+
+        for (code, area), group in fema.groupby(['state', 'area_key'], sort=False):
+            key = (code, area)
+            index.area_dates[key] = group['declarationdate'].to_numpy(dtype='datetime64[ns]')
+            index.area_types[key] = group['incidenttype'].to_numpy()
+            index.area_numbers[key] = group['disasternumber'].to_numpy()
+
+        county_lookup = {}
+        if crosswalk_df is not None:
+            for _, row in crosswalk_df.iterrows():
+                city_key = (state_code(row['STATE']), str(row['CITY']).title().strip())
+                county_lookup.setdefault(city_key, []).append(normalize_area_name(row['COUNTY']))
+        else:
+            print("Warning: no STATE, CITY, COUNTY crosswalk; cities only get independent-city and "
+                  "statewide FEMA designations, so county-level disasters are missed")
+
+        for state, city in cities_df[['STATE', 'CITY']].itertuples(index=False):
+            city_key = (state_code(state), str(city).title().strip())
+            code = city_key[0]
+            candidates = county_lookup.get(city_key, []) + [
+                f'{normalize_area_name(city_key[1])} {CITY_AREA_SUFFIX}', STATEWIDE_AREA
+            ]
+            areas = []
+            for area in candidates:
+                if (code, area) in index.area_dates and (code, area) not in areas:
+                    areas.append((code, area))
+            index.city_areas[city_key] = areas
+
+        return index
+
+    def update(self, fema_df, cities_df, states, crosswalk_df=None):
+        """Rebuild only the areas and cities of `states` (state codes) in place."""
+        states = set(states)
+
+        def in_states(df, column):
+            column = next(c for c in df.columns if c.strip().lower() == column)
+            return df[df[column].map(state_code).isin(states)]
+
+        partial = DisasterAreaIndex.build(
+            in_states(fema_df, 'state'), in_states(cities_df, 'state'),
+            in_states(crosswalk_df, 'state') if crosswalk_df is not None else None
+        )
+        for mapping, updates in [(self.area_dates, partial.area_dates), (self.area_types, partial.area_types),
+                                 (self.area_numbers, partial.area_numbers)]:
+            for key in [key for key in mapping if key[0] in states]:
+                del mapping[key]
+            mapping.update(updates)
+        for key in [key for key in self.city_areas if key[0] in states]:
+            del self.city_areas[key]
+        self.city_areas.update(partial.city_areas)
+        return self
+
+    def save(self, path):
+        with open(path, 'wb') as f:
+            pickle.dump(self, f)
+
+    @staticmethod
+    def load(path):
+        """The saved index, or None if it was saved in an older format and needs a rebuild."""
+        with open(path, 'rb') as f:
+            index = pickle.load(f)
+        if getattr(index, 'format', None) != INDEX_FORMAT:
+            print(f"{path} is in an older index format; rebuild it with python disaster_index.py")
+            return None
+        return index
+
+    def areas_for(self, state, city):
+        """Areas covering a city; `state` may be a full name or a two-letter code."""
+        return self.city_areas.get((state_code(state), str(city).title().strip()), [])
+
+    def _recent_slices(self, areas, cutoff):
+        cutoff = np.datetime64(pd.Timestamp(cutoff), 'ns')
+        for area in areas:
+            start = np.searchsorted(self.area_dates[area], cutoff, side='left')
+            yield area, start
+
+    def count_since(self, state, city, cutoff):
+        """Number of distinct disasters declared for the city on or after `cutoff`."""
+        # Even a single area can list a disaster more than once, since
+        # area_key folds spelling variants (e.g. 'X (County)' and 'X County')
+        # into one key
+        areas = self.areas_for(state, city)
+        numbers = [self.area_numbers[area][start:] for area, start in self._recent_slices(areas, cutoff)]
+        return len(np.unique(np.concatenate(numbers))) if numbers else 0
+
+    def history(self, state, city, years=5):
+        """City-level equivalent of RiskAssessment.get_disaster_history."""
+        cutoff = datetime.now() - pd.DateOffset(years=years)
+        frames = [
+            pd.DataFrame({
+                'declarationdate': self.area_dates[area][start:],
+                'incidenttype': self.area_types[area][start:],
+                'disasternumber': self.area_numbers[area][start:]
+            })
+            for area, start in self._recent_slices(self.areas_for(state, city), cutoff)
+        ]
+        recent = pd.concat(frames) if frames else pd.DataFrame(columns=['declarationdate', 'incidenttype', 'disasternumber'])
+        recent = recent.drop_duplicates(subset='disasternumber').sort_values('declarationdate')
+
+        disaster_categories = recent['incidenttype'].value_counts().to_dict()
+        return {
+            'total_disasters': len(recent),
+            'disaster_types': disaster_categories,
+            'timeline': recent[['declarationdate', 'incidenttype']].reset_index(drop=True),
+            'most_frequent': list(disaster_categories.keys())[0] if disaster_categories else None
+        }
+
+    def batch_counts(self, cities_df, years=5):
+        """Recent disaster counts for every (STATE, CITY) row of `cities_df`."""
+        cutoff = datetime.now() - pd.DateOffset(years=years)
+        counts = [self.count_since(state, city, cutoff) for state, city in cities_df[['STATE', 'CITY']].itertuples(index=False)]
+        return pd.Series(counts, index=cities_df.index, name='city_disaster_count')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Precompute the city to FEMA designated area index")
+    parser.add_argument('--fema', default='fema_cleaned.csv', help="Cleaned FEMA declarations")
+    parser.add_argument('--cities', default='unique_states_cities.csv', help="STATE, CITY list")
+    parser.add_argument('--crosswalk', default=CROSSWALK_PATH, help="STATE, CITY, COUNTY crosswalk")
+    parser.add_argument('--no-crosswalk', action='store_true',
+                        help="Build without a crosswalk (independent-city and statewide designations only)")
+    parser.add_argument('--out', default='disaster_area_index.pkl', help="Output index file")
+    args = parser.parse_args()
+
+    if not args.no_crosswalk and not os.path.exists(args.crosswalk):
+        parser.error(f"{args.crosswalk} not found: city-level counts need a STATE, CITY, COUNTY crosswalk "
+                     f"(pass --no-crosswalk to build without one)")
+    crosswalk = None if args.no_crosswalk else load_crosswalk(args.crosswalk)
+    index = DisasterAreaIndex.build(pd.read_csv(args.fema), pd.read_csv(args.cities), crosswalk)
+    # Stamp the data version so the app can refresh the index when the FEMA
+    # data changes; an index built from another FEMA file stays unversioned
+    from data_versions import DATA_INPUTS, DataVersionManager
+    fema_input = DATA_INPUTS['fema'][0]
+    if os.path.exists(fema_input) and os.path.samefile(args.fema, fema_input):
+        index.data_version = DataVersionManager().version
+    index.save(args.out)
+    mapped = sum(1 for areas in index.city_areas.values() if areas)
+    print(f"Indexed {len(index.area_dates)} designated areas; {mapped} of {len(index.city_areas)} cities mapped")
+    print(f"Index saved to {args.out}")
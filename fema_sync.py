@@ -0,0 +1,233 @@
+import argparse
+import asyncio
+import json
+import os
+import time
+
+import aiohttp
+import pandas as pd
+
+FEMA_API_URL = "https://www.fema.gov/api/open/v2/DisasterDeclarationsSummaries"
+RECORDS_KEY = 'DisasterDeclarationsSummaries'
+
+
+class RateLimiter:
+    """
+    Spaces out request start times so that at most `rate` requests
+    begin per second, no matter how many pages are in flight.
+    """
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._lock = asyncio.Lock()
+        self._next_slot = 0.0
+
+    async def wait(self):
+        async with self._lock:
+            now = time.monotonic()
+            if self._next_slot > now:
+                await asyncio.sleep(self._next_slot - now)
+                now = time.monotonic()
+            self._next_slot = now + self.interval
+
+
+class FemaSyncClient:
+    """
+    Async client that syncs the OpenFEMA DisasterDeclarationsSummaries
+    dataset into a local CSV store.
+
+    Pages are fetched concurrently (bounded by `max_concurrency`) and
+    rate limited. Every finished page is appended to the store and recorded
+    in a JSON checkpoint, so an interrupted run resumes with the pages it
+    has not fetched yet. Once a run completes, the newest `lastRefresh`
+    seen becomes the watermark and the next run only asks the API for
+    declarations refreshed after it.
+    """
+
+    def __init__(self, store_path='fema_data.csv', checkpoint_path='fema_sync_checkpoint.json',
+                 base_url=FEMA_API_URL, page_size=1000, max_concurrency=4,
+                 requests_per_second=2, max_records=None, timeout=30, retries=3,
+                 incremental_field='lastRefresh'):
+        self.store_path = store_path
+        self.checkpoint_path = checkpoint_path
+        self.base_url = base_url
+        self.page_size = page_size
+        self.max_concurrency = max_concurrency
+        self.rate_limiter = RateLimiter(requests_per_second)
+        self.max_records = max_records
+        self.timeout = timeout
+        self.retries = retries
+        self.incremental_field = incremental_field
+        self._write_lock = asyncio.Lock()
+        self._columns = None
+
+    # Checkpoint handling
+    def load_checkpoint(self):
+        if os.path.exists(self.checkpoint_path):
+            with open(self.checkpoint_path) as f:
+                return json.load(f)
+        return {'watermark': None, 'run': None}
+
+    def save_checkpoint(self, checkpoint):
+        # Write then rename so a crash never leaves a half-written checkpoint
+        tmp_path = self.checkpoint_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(checkpoint, f, indent=2)
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def store_watermark(self):
+        """Newest incremental-field value already present in the local store."""
+        if not os.path.exists(self.store_path):
+            return None
+        header = pd.read_csv(self.store_path, nrows=0).columns
+        field = self.incremental_field if self.incremental_field in header else 'declarationDate'
+        if field not in header:
+            return None
+        values = pd.read_csv(self.store_path, usecols=[field])[field].dropna()
+        return values.max() if not values.empty else None
+
+    # Request helpers
+    def _params(self, since, top, skip, count=False):
+        params = {
+            "$top": top,
+            "$skip": skip,
+            "$orderby": f"{self.incremental_field},id",
+            "$format": "json"
+        }
+        if since:
+            params["$filter"] = f"{self.incremental_field} gt '{since}'"
+        if count:
+            params["$inlinecount"] = "allpages"
+        return params
+
+    async def _get_json(self, session, params):
+        for attempt in range(self.retries + 1):
+            await self.rate_limiter.wait()
+            try:
+                async with session.get(self.base_url, params=params) as response:
+                    if response.status == 429 or response.status >= 500:
+                        raise aiohttp.ClientResponseError(
+                            response.request_info, response.history,
+                            status=response.status, message=response.reason
+                        )
+                    response.raise_for_status()
+                    return await response.json(content_type=None)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if attempt == self.retries:
+                    raise
+                backoff = 2 ** attempt
+                print(f"Request failed at skip={params['$skip']} ({e}), retrying in {backoff}s...")
+                await asyncio.sleep(backoff)
+
+    async def fetch_count(self, session, since):
+        data = await self._get_json(session, self._params(since, top=1, skip=0, count=True))
+        return int(data.get('metadata', {}).get('count', 0))
+
+    # Store handling
+    async def _append_page(self, records):
+        page_df = pd.json_normalize(records)
+        async with self._write_lock:
+            if self._columns is None:
+                if os.path.exists(self.store_path):
+                    self._columns = pd.read_csv(self.store_path, nrows=0).columns.tolist()
+                else:
+                    self._columns = page_df.columns.tolist()
+                    page_df.to_csv(self.store_path, index=False)
+                    return
+            page_df.reindex(columns=self._columns).to_csv(
+                self.store_path, mode='a', header=False, index=False
+            )
+
+    async def _sync_page(self, session, semaphore, skip, checkpoint):
+        run = checkpoint['run']
+        async with semaphore:
+            top = min(self.page_size, run['total'] - skip)
+            print(f"Fetching records {skip} to {skip + top}...")
+            data = await self._get_json(session, self._params(run['since'], top, skip))
+            records = data.get(RECORDS_KEY, [])
+            if records:
+                await self._append_page(records)
+                newest = max((r.get(self.incremental_field) or '' for r in records), default='')
+                if newest and (run['max_seen'] is None or newest > run['max_seen']):
+                    run['max_seen'] = newest
+            run['done'].append(skip)
+            self.save_checkpoint(checkpoint)
+            return len(records)
+
+    async def sync(self):
+        """
+        Run (or resume) one sync pass.
+
+        Returns:
+            Number of records appended to the store during this call
+        """
+        checkpoint = self.load_checkpoint()
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+
+        async with aiohttp.ClientSession(timeout=timeout) as session:
+            if checkpoint.get('run') is None:
+                since = checkpoint.get('watermark') or self.store_watermark()
+                total = await self.fetch_count(session, since)
+                if self.max_records is not None:
+                    total = min(total, self.max_records)
+                checkpoint['run'] = {'since': since, 'total': total, 'done': [], 'max_seen': since}
+                self.save_checkpoint(checkpoint)
+                print(f"Syncing {total} declarations newer than {since or 'the beginning'}...")
+            else:
+                print(f"Resuming interrupted sync ({len(checkpoint['run']['done'])} pages already done)...")
+
+            run = checkpoint['run']
+            done = set(run['done'])
+            pending = [skip for skip in range(0, run['total'], self.page_size) if skip not in done]
+
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+            counts = await asyncio.gather(*[
+                self._sync_page(session, semaphore, skip, checkpoint) for skip in pending
+            ])
+
+        checkpoint['watermark'] = run['max_seen']
+        checkpoint['run'] = None
+        self.save_checkpoint(checkpoint)
+
+        appended = sum(counts)
+        print(f"Total records appended: {appended}")
+        return appended
+
+
+def load_fema_store(store_path='fema_data.csv'):
+    """
+    Load the synced store, keeping only the latest version of each record.
+
+    Incremental runs append refreshed declarations that already exist, and
+    a page can be appended twice if a run dies before it is checkpointed.
+    """
+    df = pd.read_csv(store_path)
+    if 'id' in df.columns:
+        df = df.drop_duplicates(subset='id', keep='last').reset_index(drop=True)
+    return df
+
+
+def run_sync(**kwargs):
+    return asyncio.run(FemaSyncClient(**kwargs).sync())
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Sync FEMA disaster declarations into a local CSV store")
+    parser.add_argument('--store', default='fema_data.csv', help="Local FEMA store (CSV)")
+    parser.add_argument('--checkpoint', default='fema_sync_checkpoint.json', help="Checkpoint file")
+    parser.add_argument('--base-url', default=FEMA_API_URL, help="API endpoint")
+    parser.add_argument('--page-size', type=int, default=1000)
+    parser.add_argument('--concurrency', type=int, default=4, help="Pages fetched at once")
+    parser.add_argument('--rate', type=float, default=2, help="Max requests started per second")
+    parser.add_argument('--max-records', type=int, default=None, help="Stop after this many records")
+    args = parser.parse_args()
+
+    run_sync(
+        store_path=args.store,
+        checkpoint_path=args.checkpoint,
+        base_url=args.base_url,
+        page_size=args.page_size,
+        max_concurrency=args.concurrency,
+        requests_per_second=args.rate,
+        max_records=args.max_records
+    )
@@ -0,0 +1,375 @@
+"""
+Streaming analysis of hourly weather for many cities.
+
+HourlyWeatherAnalyzer (Weather_Analysis.ipynb) loads a city's hourly
+series into a DataFrame before computing its metrics. At 24 rows per
+city-day that does not scale to thousands of cities. This pipeline:
+
+  - reads hourly records in chunks (never a whole city or file at once)
+  - keeps online per-city statistics: Welford count/mean/variance plus
+    min/max per variable, and exceedance counts for heat hours
+    (temperature > 90F), freezing hours (< 32F), heavy-rain hours
+    (precipitation > 0.3in) and high-wind hours (wind > 20mph), with the
+    notebook's thresholds
+  - downsamples to daily and monthly aggregates under the merged dataset's
+    weather column names (avg_temp, min_temp, max_temp, wind_speed,
+    precipitation, humidity, pressure, source_count), keyed like the
+    merged dataset by full state name ('TEXAS') and title-case city
+
+Work is partitioned by city. The notebook's per-city cache files
+(weather_cache/{STATE}_{City}_hourly.csv) are partitions already; a
+single combined hourly file is first split by city hash. Each partition
+is processed by a worker process, so throughput scales with cores and
+each worker holds only its own cities' daily rows.
+
+    python hourly_weather.py --cache-dir weather_cache --workers 8
+    python hourly_weather.py noaa_hourly.csv --workers 8 --out-prefix noaa
+"""
+import argparse
+import csv
+import glob
+import itertools
+import os
+import re
+import shutil
+import sys
+import tempfile
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from disaster_index import STATE_CODES, state_code
+
+# The merged dataset spells states out ('TEXAS'); weather_cache files use codes ('TX')
+STATE_NAMES = {code: name for name, code in STATE_CODES.items()}
+
+# Hourly input column -> aliases accepted in source files
+INPUT_COLUMNS = {
+    'date': ['date', 'datetime', 'timestamp'],
+    'state': ['state'],
+    'city': ['city'],
+    'temperature': ['temperature', 'temp'],
+    'humidity': ['humidity'],
+    'precipitation': ['precipitation', 'precip'],
+    'wind_speed': ['wind_speed', 'wind'],
+    'pressure': ['pressure']
+}
+VARIABLES = ['temperature', 'humidity', 'precipitation', 'wind_speed', 'pressure']
+
+# Exceedance thresholds from HourlyWeatherAnalyzer
+HEAT_THRESHOLD = 90
+FREEZE_THRESHOLD = 32
+HEAVY_RAIN_THRESHOLD = 0.3
+HIGH_WIND_THRESHOLD = 20
+EXCEEDANCES = ['heat_hours', 'freezing_hours', 'heavy_rain_hours', 'high_wind_hours']
+
+CACHE_FILE_PATTERN = re.compile(r'(?P<state>.+?)_(?P<city>.+)_hourly\.csv$')
+
+
+def _state_name(state):
+    """Full upper-case state name (as in the merged dataset) for a name or code."""
+    code = state_code(state)
+    return STATE_NAMES.get(code, code)
+
+
+def _location_keys(states, cities):
+    """Normalised (STATE name, City) columns; states are mapped once per distinct value."""
+    states = states.astype(str).str.upper().str.strip()
+    states = states.map({state: _state_name(state) for state in states.unique()})
+    return states, cities.astype(str).str.title().str.strip()
+
+
+def _standardize(chunk, path):
+    """Rename source columns to INPUT_COLUMNS names; fill state/city from a cache file name."""
+    lookup = {column.strip().lower(): column for column in chunk.columns}
+    renames = {}
+    for name, aliases in INPUT_COLUMNS.items():
+        source = next((lookup[alias] for alias in aliases if alias in lookup), None)
+        if source is not None:
+            renames[source] = name
+    chunk = chunk.rename(columns=renames)
+
+    if 'state' not in chunk or 'city' not in chunk:
+        match = CACHE_FILE_PATTERN.match(os.path.basename(path))
+        if match is None:
+            raise ValueError(f"{path} has no state/city columns and is not a weather_cache file")
+        chunk = chunk.assign(state=match['state'], city=match['city'])
+
+    chunk['state'], chunk['city'] = _location_keys(chunk['state'], chunk['city'])
+    chunk['date'] = pd.to_datetime(chunk['date'], errors='coerce').dt.normalize()
+    for name in VARIABLES:
+        chunk[name] = pd.to_numeric(chunk[name], errors='coerce') if name in chunk else np.nan
+    return chunk.dropna(subset=['date'])
+
+
+def _exceedances(chunk):
+    return pd.DataFrame({
+        'heat_hours': chunk['temperature'] > HEAT_THRESHOLD,
+        'freezing_hours': chunk['temperature'] < FREEZE_THRESHOLD,
+        'heavy_rain_hours': chunk['precipitation'] > HEAVY_RAIN_THRESHOLD,
+        'high_wind_hours': chunk['wind_speed'] > HIGH_WIND_THRESHOLD
+    }, index=chunk.index).astype(np.int64)
+
+
+class CityStats:
+    """
+    Online per-city statistics, merged one chunk at a time.
+
+    For every variable: count, mean and M2 (sum of squared deviations),
+    combined with Chan et al.'s parallel form of Welford's update, plus
+    min and max. Exceedance hours are plain counts.
+    """
+
+    def __init__(self):
+        self.stats = None
+
+    def update(self, chunk):
+        grouped = chunk.groupby(['state', 'city'])
+        parts = {}
+        for name in VARIABLES:
+            values = grouped[name]
+            parts[(name, 'count')] = values.count()
+            parts[(name, 'mean')] = values.mean()
+            parts[(name, 'm2')] = values.var(ddof=0) * values.count()
+            parts[(name, 'min')] = values.min()
+            parts[(name, 'max')] = values.max()
+        exceedances = _exceedances(chunk).groupby([chunk['state'], chunk['city']]).sum()
+        for name in EXCEEDANCES:
+            parts[(name, 'count')] = exceedances[name]
+        parts[('rows', 'count')] = grouped.size()
+        part = pd.DataFrame(parts).fillna({column: 0 for column in parts if column[1] in ('count', 'm2')})
+        self.stats = part if self.stats is None else self._merge(self.stats, part)
+
+    @staticmethod
+    def _merge(left, right):
+        index = left.index.union(right.index)
+        left, right = left.reindex(index), right.reindex(index)
+        merged = {}
+        for name in VARIABLES:
+            n_a = left[(name, 'count')].fillna(0)
+            n_b = right[(name, 'count')].fillna(0)
+            n = n_a + n_b
+            mean_a = left[(name, 'mean')].fillna(0)
+            mean_b = right[(name, 'mean')].fillna(0)
+            delta = mean_b - mean_a
+            with np.errstate(invalid='ignore', divide='ignore'):
+                merged[(name, 'mean')] = (mean_a + delta * n_b / n).where(n > 0)
+                merged[(name, 'm2')] = (left[(name, 'm2')].fillna(0) + right[(name, 'm2')].fillna(0)
+                                        + delta ** 2 * n_a * n_b / n).where(n > 0, 0)
+            merged[(name, 'count')] = n
+            merged[(name, 'min')] = np.fmin(left[(name, 'min')], right[(name, 'min')])
+            merged[(name, 'max')] = np.fmax(left[(name, 'max')], right[(name, 'max')])
+        for name in EXCEEDANCES + ['rows']:
+            merged[(name, 'count')] = left[(name, 'count')].fillna(0) + right[(name, 'count')].fillna(0)
+        return pd.DataFrame(merged, index=index)
+
+    def summary(self):
+        """One row per city: hours, mean/std/min/max per variable and exceedance hours."""
+        if self.stats is None:
+            return pd.DataFrame()
+        rows = {'hours': self.stats[('rows', 'count')].astype(np.int64)}
+        for name in VARIABLES:
+            count = self.stats[(name, 'count')]
+            rows[f'{name}_mean'] = self.stats[(name, 'mean')]
+            rows[f'{name}_std'] = np.sqrt(self.stats[(name, 'm2')] / (count - 1).where(count > 1))
+            rows[f'{name}_min'] = self.stats[(name, 'min')]
+            rows[f'{name}_max'] = self.stats[(name, 'max')]
+        for name in EXCEEDANCES:
+            rows[name] = self.stats[(name, 'count')].astype(np.int64)
+        return pd.DataFrame(rows).reset_index().rename(columns={'state': 'STATE', 'city': 'CITY'})
+
+
+def _daily_partial(chunk):
+    """Sums, counts and extremes per (state, city, date) for one chunk."""
+    frame = pd.concat([chunk[['state', 'city', 'date'] + VARIABLES], _exceedances(chunk)], axis=1)
+    grouped = frame.groupby(['state', 'city', 'date'])
+    partial = pd.concat({
+        'sum': grouped[VARIABLES].sum(min_count=1),
+        'count': grouped[VARIABLES].count(),
+        'min': grouped[['temperature']].min(),
+        'max': grouped[['temperature']].max(),
+        'hours': grouped[EXCEEDANCES].sum().assign(rows=grouped.size())
+    }, axis=1)
+    return partial
+
+
+def _partial_aggregations(partial):
+    """How each partial column merges: extremes by min/max, everything else by sum."""
+    return {column: {'min': 'min', 'max': 'max'}.get(column[0], 'sum') for column in partial.columns}
+
+
+def _combine_partials(partials):
+    partial = pd.concat(partials)
+    return partial.groupby(level=list(range(partial.index.nlevels))).agg(_partial_aggregations(partial))
+
+
+def _to_weather_columns(partial):
+    """Sums/counts/extremes -> merged-dataset weather columns."""
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = partial['sum'] / partial['count'].where(partial['count'] > 0)
+    out = pd.DataFrame({
+        'avg_temp': mean['temperature'],
+        'min_temp': partial[('min', 'temperature')],
+        'max_temp': partial[('max', 'temperature')],
+        'wind_speed': mean['wind_speed'],
+        'precipitation': partial[('sum', 'precipitation')],
+        'humidity': mean['humidity'],
+        'pressure': mean['pressure'],
+        'source_count': partial[('hours', 'rows')].astype(np.int64)
+    })
+    for name in EXCEEDANCES:
+        out[name] = partial[('hours', name)].astype(np.int64)
+    return out.round(2)
+
+
+def process_partition(paths, chunksize=100000):
+    """
+    Worker: stream every file of one city partition.
+
+    Returns:
+        (daily DataFrame, monthly DataFrame, per-city summary DataFrame)
+    """
+    city_stats = CityStats()
+    partials = []
+    for path in paths:
+        for chunk in pd.read_csv(path, chunksize=chunksize):
+            chunk = _standardize(chunk, path)
+            if chunk.empty:
+                continue
+            city_stats.update(chunk)
+            partials.append(_daily_partial(chunk))
+            # Fold partials together regularly so memory tracks days, not chunks
+            if len(partials) >= 8:
+                partials = [_combine_partials(partials)]
+
+    if not partials:
+        return pd.DataFrame(), pd.DataFrame(), pd.DataFrame()
+
+    daily_partial = _combine_partials(partials)
+    daily = _to_weather_columns(daily_partial)
+
+    # YEAR/MONTH keys match the merged dataset (see weather_fill.GROUP_COLUMNS)
+    dates = daily_partial.index.get_level_values('date')
+    monthly_partial = daily_partial.groupby([
+        daily_partial.index.get_level_values('state'),
+        daily_partial.index.get_level_values('city'),
+        dates.year.rename('YEAR'),
+        dates.month.rename('MONTH')
+    ]).agg(_partial_aggregations(daily_partial))
+    monthly = _to_weather_columns(monthly_partial)
+
+    def flat(frame):
+        return frame.reset_index().rename(columns={'state': 'STATE', 'city': 'CITY', 'date': 'DATE'})
+
+    return flat(daily), flat(monthly), city_stats.summary()
+
+
+def partition_hourly_file(path, partition_dir, partitions, chunksize=200000):
+    """
+    Split one combined hourly file into `partitions` files by city hash.
+    Lines are copied verbatim (hourly records have no multi-line quoted
+    fields); each line's state and city are parsed from that same line, and
+    blank lines are dropped.
+    """
+    os.makedirs(partition_dir, exist_ok=True)
+    paths = [os.path.join(partition_dir, f'part_{i:04d}.csv') for i in range(partitions)]
+    outputs = {}
+    with open(path, newline='') as f:
+        header = f.readline()
+        lookup = {column.strip().lower(): i for i, column in enumerate(next(csv.reader([header])))}
+        if 'state' not in lookup or 'city' not in lookup:
+            raise ValueError(f"{path} has no state/city columns")
+        state_field, city_field = lookup['state'], lookup['city']
+        try:
+            while True:
+                lines = list(itertools.islice(f, chunksize))
+                if not lines:
+                    break
+                lines = [line for line in lines if line.strip()]
+                rows = list(csv.reader(lines))
+                states, cities = _location_keys(
+                    pd.Series([row[state_field] if len(row) > state_field else '' for row in rows]),
+                    pd.Series([row[city_field] if len(row) > city_field else '' for row in rows])
+                )
+                codes, keys = pd.factorize(states + '|' + cities)
+                buckets = np.array([zlib.crc32(key.encode()) % partitions for key in keys], dtype=np.int64)[codes]
+                for i in np.unique(buckets):
+                    if i not in outputs:
+                        outputs[i] = open(paths[i], 'w', newline='')
+                        outputs[i].write(header)
+                    outputs[i].writelines(lines[row] for row in np.flatnonzero(buckets == i))
+        finally:
+            for output in outputs.values():
+                output.close()
+    return [[paths[i]] for i in sorted(outputs)]
+
+
+def cache_partitions(cache_dir, partitions):
+    """Group the per-city cache files into `partitions` lists (one city per file)."""
+    files = sorted(glob.glob(os.path.join(cache_dir, '*_hourly.csv')))
+    groups = [files[i::partitions] for i in range(partitions)]
+    return [group for group in groups if group]
+
+
+def run(partitions, out_prefix, workers, chunksize):
+    daily_path, monthly_path, stats_path = (f'{out_prefix}_daily.csv', f'{out_prefix}_monthly.csv',
+                                            f'{out_prefix}_city_stats.csv')
+    for path in (daily_path, monthly_path):
+        if os.path.exists(path):
+            os.remove(path)
+
+    summaries = []
+    days = 0
+    start = time.time()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(process_partition, paths, chunksize) for paths in partitions]
+        for done, future in enumerate(as_completed(futures), 1):
+            daily, monthly, summary = future.result()
+            if daily.empty:
+                continue
+            daily.to_csv(daily_path, mode='a', header=not os.path.exists(daily_path), index=False)
+            monthly.to_csv(monthly_path, mode='a', header=not os.path.exists(monthly_path), index=False)
+            summaries.append(summary)
+            days += len(daily)
+            print(f"\rPartitions {done}/{len(futures)} · {days} city-days in {time.time() - start:.1f}s",
+                  end='', file=sys.stderr)
+
+    summary = pd.concat(summaries, ignore_index=True) if summaries else pd.DataFrame()
+    summary.to_csv(stats_path, index=False)
+    hours = int(summary['hours'].sum()) if len(summary) else 0
+    elapsed = time.time() - start
+    print(f"\nProcessed {hours} hourly records for {len(summary)} cities with {workers} workers "
+          f"in {elapsed:.1f}s ({hours / elapsed if elapsed else 0:,.0f} records/s)", file=sys.stderr)
+    print(f"Wrote {daily_path}, {monthly_path} and {stats_path}", file=sys.stderr)
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('input', nargs='?', default=None, help="Combined hourly CSV (state, city, date, ...)")
+    parser.add_argument('--cache-dir', default='weather_cache', help="Per-city {STATE}_{City}_hourly.csv files")
+    parser.add_argument('--out-prefix', default='hourly_weather', help="Prefix for the output CSVs")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="Worker processes")
+    parser.add_argument('--partitions', type=int, default=None, help="City partitions (default: 4 x workers)")
+    parser.add_argument('--chunksize', type=int, default=100000, help="Hourly rows per chunk")
+    args = parser.parse_args()
+
+    partitions = args.partitions or args.workers * 4
+    if args.input:
+        partition_dir = tempfile.mkdtemp(prefix='hourly_partitions_')
+        try:
+            start = time.time()
+            groups = partition_hourly_file(args.input, partition_dir, partitions, args.chunksize)
+            print(f"Split {args.input} into {len(groups)} city partitions in {time.time() - start:.1f}s")
+            run(groups, args.out_prefix, args.workers, args.chunksize)
+        finally:
+            shutil.rmtree(partition_dir, ignore_errors=True)
+    else:
+        run(cache_partitions(args.cache_dir, partitions), args.out_prefix, args.workers, args.chunksize)
+
+
+if __name__ == '__main__':
+    main()
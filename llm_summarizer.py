@@ -0,0 +1,327 @@
+"""
+Cached, concurrent LLM summaries for the market and FEMA reports.
+
+The notebook's MarketAgent.summarize_with_llm and FEMA pattern questions
+send one blocking Cohere request per prompt on every run. Here prompts go
+through a Summarizer:
+
+  - responses are cached on disk (one JSON file per prompt) under a hash
+    of the backend, model, generation settings and whitespace-normalised
+    prompt, so a re-run only calls the backend for prompts it has not
+    seen before
+  - uncached prompts are sent concurrently, at most `max_concurrency` at
+    a time, with retries and backoff
+  - per-state summaries go out as one batch; a state's prompt contains
+    its current figures, so only states whose data changed miss the cache
+
+Backends: CohereBackend (needs the `cohere` package and COHERE_API_KEY)
+and LocalBackend, a deterministic offline stand-in for testing.
+
+    python llm_summarizer.py --report fema states --backend local
+    python llm_summarizer.py --report states --backend cohere --concurrency 8
+"""
+import abc
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from data_store import SharedDataset
+from screening import load_city_metrics
+from timeseries_store import CityTimeSeriesStore
+
+DEFAULT_MODEL = 'command-r-plus'
+CACHE_DIR = 'llm_cache'
+
+# The FEMA pattern questions from the project notebook
+FEMA_QUESTIONS = [
+    "Analyze this FEMA data: 4300 hurricanes, 5000 floods, 3000 tornadoes. What unusual patterns do you see?",
+    "Group U.S. states into clusters based on their disaster profiles.",
+    "Which three states should prioritize disaster preparedness investments?",
+    "Forecast disaster trends for the next 5 years if current patterns continue.",
+    "Write a short news article focusing on Texas and including a fictional emergency manager quote.",
+    "What risk advice would you give to a new homeowner in Florida?",
+    "Create a risk score (out of 10) for California, Florida, and Texas, based on hurricane, flood, and tornado risks."
+]
+
+
+def normalize_prompt(prompt):
+    """Collapse whitespace so formatting-only differences share a cache entry."""
+    return re.sub(r'\s+', ' ', prompt).strip()
+
+
+class LLMBackend(abc.ABC):
+    """Interface for completion backends. `name` and `model` go into the cache key."""
+
+    name = 'base'
+    model = None
+
+    @abc.abstractmethod
+    async def complete(self, prompt, temperature=0.5, max_tokens=500):
+        """Completion text for `prompt`."""
+
+
+class CohereBackend(LLMBackend):
+    """Cohere chat API (the notebook's command-r-plus)."""
+
+    name = 'cohere'
+
+    def __init__(self, api_key=None, model=DEFAULT_MODEL):
+        try:
+            import cohere
+        except ImportError:
+            raise ImportError("CohereBackend needs the cohere package: pip install cohere")
+        api_key = api_key or os.environ.get('COHERE_API_KEY')
+        if not api_key:
+            raise ValueError("Set COHERE_API_KEY or pass api_key")
+        self.model = model
+        self.client = cohere.AsyncClient(api_key)
+
+    async def complete(self, prompt, temperature=0.5, max_tokens=500):
+        response = await self.client.chat(
+            model=self.model,
+            message=prompt,
+            temperature=temperature,
+            max_tokens=max_tokens
+        )
+        return response.text
+
+
+class LocalBackend(LLMBackend):
+    """
+    Deterministic offline stand-in: the same prompt always gives the same
+    text, built from the prompt's own questions and figures. Counts calls
+    so tests can check what reached the backend.
+    """
+
+    name = 'local'
+
+    def __init__(self, model='local-summary', latency=0.0):
+        self.model = model
+        self.latency = latency
+        self.calls = 0
+
+    async def complete(self, prompt, temperature=0.5, max_tokens=500):
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        digest = hashlib.sha256(prompt.encode()).hexdigest()[:8]
+        lines = [line.strip() for line in prompt.splitlines() if line.strip()]
+        asks = [line.lstrip('- ') for line in lines if line.endswith('?') or line.startswith('- ')]
+        figures = re.findall(r'-?\d[\d,]*\.?\d*', prompt)
+        words = (f"[local summary {digest}] {lines[0] if lines else ''} "
+                 f"Covers {len(asks) or 1} question(s); key figures: {', '.join(figures[:8]) or 'none'}.").split()
+        return ' '.join(words[:max_tokens])
+
+
+class ResponseCache:
+    """One JSON file per cached response, keyed by prompt hash."""
+
+    def __init__(self, cache_dir=CACHE_DIR):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def key(backend, prompt, temperature, max_tokens):
+        payload = json.dumps([backend.name, backend.model, temperature, max_tokens, normalize_prompt(prompt)])
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f'{key}.json')
+
+    def get(self, key):
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            return json.load(f)['response']
+
+    def put(self, key, prompt, response, backend):
+        path = self._path(key)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'backend': backend.name, 'model': backend.model, 'prompt': prompt,
+                       'response': response, 'created': time.strftime('%Y-%m-%dT%H:%M:%S')}, f, indent=2)
+        os.replace(tmp_path, path)
+
+
+class Summarizer:
+    """Cache-first, concurrency-bounded prompt runner."""
+
+    def __init__(self, backend, cache=None, max_concurrency=4, temperature=0.5, max_tokens=500, retries=3):
+        self.backend = backend
+        self.cache = cache if cache is not None else ResponseCache()
+        self.max_concurrency = max_concurrency
+        self.temperature = temperature
+        self.max_tokens = max_tokens
+        self.retries = retries
+        self.stats = {'prompts': 0, 'cache_hits': 0, 'remote_calls': 0}
+
+    async def _call(self, key, prompt, semaphore):
+        async with semaphore:
+            for attempt in range(self.retries + 1):
+                try:
+                    self.stats['remote_calls'] += 1
+                    response = await self.backend.complete(prompt, self.temperature, self.max_tokens)
+                except Exception as e:
+                    if attempt == self.retries:
+                        raise
+                    backoff = 2 ** attempt
+                    print(f"LLM request failed ({e}), retrying in {backoff}s...")
+                    await asyncio.sleep(backoff)
+                    continue
+                # Cache as soon as it arrives, so a later failure in the
+                # batch does not cost this response on the next run
+                self.cache.put(key, prompt, response, self.backend)
+                return response
+
+    async def summarize_many(self, prompts):
+        """Responses for `prompts`, in order; only uncached, distinct prompts reach the backend."""
+        keys = [self.cache.key(self.backend, prompt, self.temperature, self.max_tokens) for prompt in prompts]
+        self.stats['prompts'] += len(prompts)
+
+        responses = {}
+        pending = {}
+        for key, prompt in zip(keys, prompts):
+            if key in responses or key in pending:
+                self.stats['cache_hits'] += 1
+                continue
+            cached = self.cache.get(key)
+            if cached is not None:
+                self.stats['cache_hits'] += 1
+                responses[key] = cached
+            else:
+                pending[key] = prompt
+
+        if pending:
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+            results = await asyncio.gather(*(self._call(key, prompt, semaphore) for key, prompt in pending.items()),
+                                           return_exceptions=True)
+            errors = [result for result in results if isinstance(result, BaseException)]
+            if errors:
+                raise errors[0]
+            responses.update(zip(pending, results))
+
+        return [responses[key] for key in keys]
+
+    def summarize(self, prompts):
+        """
+        Blocking wrapper around summarize_many for scripts and notebooks.
+        Inside a running event loop (Jupyter), where asyncio.run is not
+        allowed, the batch runs on a worker thread with its own loop; async
+        callers can `await summarize_many(...)` directly instead.
+        """
+        single = isinstance(prompts, str)
+        batch = [prompts] if single else list(prompts)
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            results = asyncio.run(self.summarize_many(batch))
+        else:
+            with ThreadPoolExecutor(max_workers=1) as pool:
+                results = pool.submit(asyncio.run, self.summarize_many(batch)).result()
+        return results[0] if single else results
+
+
+def market_summary_prompt(data):
+    """MarketAgent.summarize_with_llm's prompt for a loaded Redfin frame."""
+    return f"""
+You are a real estate market analyst.
+Analyze the following dataset description:
+
+Columns:
+{', '.join(data.columns.tolist())}
+
+Some sample statistics:
+{data.describe().to_string()}
+
+Top 10 missing value columns:
+{data.isnull().sum().sort_values(ascending=False).head(10).to_string()}
+
+Based on this, summarize:
+- What key metrics this dataset tracks?
+- What kinds of trends or insights might it reveal?
+- Any concerns or missing data issues to watch out for?
+- How would you recommend cleaning or imputing missing data?
+"""
+
+
+def state_summary_prompts(metrics):
+    """
+    One prompt per state from the per-city metrics table (screening.py),
+    built only from that state's figures.
+    """
+    prompts = {}
+    for state, group in metrics.groupby('STATE'):
+        recommendations = group['recommendation'].value_counts()
+        prompts[state] = f"""
+You are a real estate market analyst writing a short climate-aware market brief.
+
+State: {state}
+Cities covered: {len(group)}
+Median current price: ${group['current_price'].median():,.0f}
+Median predicted 12-month price change: {group['price_change'].median():.1f}%
+Median weather risk (0-100): {group['overall_risk'].median():.1f}
+Median FEMA disaster count: {group['fema_disaster_count'].median():.0f}
+Recommendations: {', '.join(f'{name}: {count}' for name, count in recommendations.items())}
+
+In under 150 words, summarize:
+- How is the housing market trending?
+- How much does climate and disaster risk weigh on it?
+- Which kinds of buyers should be cautious?
+"""
+    return prompts
+
+
+def summarize_states(summarizer, metrics, states=None):
+    """Per-state summaries {state: text}, sent as one concurrent batch."""
+    prompts = state_summary_prompts(metrics if states is None else metrics[metrics['STATE'].isin(states)])
+    return dict(zip(prompts, summarizer.summarize(list(prompts.values()))))
+
+
+def make_backend(name, model=None):
+    if name == 'cohere':
+        return CohereBackend(model=model or DEFAULT_MODEL)
+    return LocalBackend()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--report', nargs='+', choices=['fema', 'states', 'market'], default=['fema', 'states'])
+    parser.add_argument('--backend', choices=['local', 'cohere'], default='local')
+    parser.add_argument('--model', default=None, help=f"Backend model (cohere default: {DEFAULT_MODEL})")
+    parser.add_argument('--data', default='filled_redfin_noaa_data.csv', help="Merged Redfin/NOAA dataset")
+    parser.add_argument('--market-data', default='city_market_tracker.tsv000.gz', help="Redfin market tracker (TSV)")
+    parser.add_argument('--state', action='append', default=None, help="Limit state summaries (repeatable)")
+    parser.add_argument('--cache-dir', default=CACHE_DIR)
+    parser.add_argument('--concurrency', type=int, default=4, help="Maximum requests in flight")
+    args = parser.parse_args()
+
+    summarizer = Summarizer(make_backend(args.backend, args.model), ResponseCache(args.cache_dir),
+                            max_concurrency=args.concurrency)
+    start = time.time()
+
+    if 'market' in args.report:
+        print("\nLLM Analysis:")
+        print(summarizer.summarize(market_summary_prompt(pd.read_csv(args.market_data, sep='\t'))))
+
+    if 'fema' in args.report:
+        for question, answer in zip(FEMA_QUESTIONS, summarizer.summarize(FEMA_QUESTIONS)):
+            print(f"Question: {question}")
+            print(f"Answer: {answer}\n")
+
+    if 'states' in args.report:
+        metrics = load_city_metrics(CityTimeSeriesStore.from_dataset(SharedDataset.from_csv(args.data)))
+        states = [state.upper().strip() for state in args.state] if args.state else None
+        for state, summary in summarize_states(summarizer, metrics, states).items():
+            print(f"== {state} ==\n{summary}\n")
+
+    stats = summarizer.stats
+    print(f"{stats['prompts']} prompts: {stats['cache_hits']} from cache, "
+          f"{stats['remote_calls']} backend calls in {time.time() - start:.1f}s")
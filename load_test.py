@@ -0,0 +1,251 @@
+"""
+Load-test the dashboard's analysis path under concurrent analysts.
+
+Every worker thread is one simulated analyst session. It draws locations
+from a realistic mix: a few hot cities take most of the traffic and the
+rest comes from a long tail over unique_states_cities.csv. Two modes:
+
+  scoring  - calls what get_location_analysis runs (store lookup, price
+             analysis, price chart, weather risk, recommendation) directly,
+             with a per-session analysis cache like
+             st.session_state.analysis_cache
+  app      - drives ClimateWiseRealEstate.py through Streamlit's headless
+             AppTest: select state and city, click the analysis button,
+             and time the rerun that renders the analysis
+
+For each concurrency level it reports throughput, p50/p95/p99 latency
+of cache misses (the analysis itself) and of cache hits separately, peak
+RSS and the session cache hit rate.
+
+    python load_test.py --concurrency 1 4 16 --requests 2000
+    python load_test.py --mode app --concurrency 1 4 --requests 100
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import psutil
+
+from data_store import SharedDataset
+from scoring import analyze_price, analyze_weather_risk, create_price_chart, get_investment_recommendation
+from timeseries_store import CityTimeSeriesStore
+
+
+def city_mix(cities, requests, hot_cities=20, hot_share=0.6, seed=0):
+    """
+    Request sequence of (STATE, CITY): `hot_share` of requests go to
+    `hot_cities` popular cities (Zipf-weighted among themselves), the rest
+    are spread uniformly over the long tail.
+    """
+    rng = np.random.default_rng(seed)
+    cities = cities.iloc[rng.permutation(len(cities))].reset_index(drop=True)
+    hot_cities = min(hot_cities, len(cities))
+    hot_weights = 1 / np.arange(1, hot_cities + 1)
+    hot_weights /= hot_weights.sum()
+
+    is_hot = rng.random(requests) < hot_share
+    if hot_cities == len(cities):
+        is_hot[:] = True
+    picks = np.where(
+        is_hot,
+        rng.choice(hot_cities, size=requests, p=hot_weights),
+        rng.integers(hot_cities, max(len(cities), hot_cities + 1), size=requests)
+    )
+    return [tuple(row) for row in cities[['STATE', 'CITY']].to_numpy()[picks]]
+
+
+class RssSampler(threading.Thread):
+    """Samples process RSS in the background and keeps the peak."""
+
+    def __init__(self, interval=0.05):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.peak = 0
+        self._done = threading.Event()
+
+    def run(self):
+        process = psutil.Process()
+        while not self._done.is_set():
+            self.peak = max(self.peak, process.memory_info().rss)
+            time.sleep(self.interval)
+
+    def stop(self):
+        self._done.set()
+        self.join()
+        return self.peak / 1024 ** 2
+
+
+def run_sessions(mix, concurrency, make_session):
+    """
+    Run `mix` across `concurrency` session threads. make_session() returns a
+    callable (state, city) -> (cache_hit, latency_seconds) for one analyst.
+
+    Returns:
+        Dictionary of per-request latencies (seconds) for cache misses and
+        hits, the error count, wall time and peak RSS
+    """
+    position = iter(range(len(mix)))
+    lock = threading.Lock()
+    latencies = {False: [], True: []}
+    errors = [0]
+
+    def worker():
+        try:
+            session = make_session()
+        except Exception as e:
+            print(f"Error starting session: {e}", file=sys.stderr)
+            with lock:
+                errors[0] += 1
+            return
+        while True:
+            with lock:
+                i = next(position, None)
+            if i is None:
+                return
+            state, city = mix[i]
+            try:
+                hit, elapsed = session(state, city)
+            except Exception as e:
+                print(f"Error analyzing {city}, {state}: {e}", file=sys.stderr)
+                with lock:
+                    errors[0] += 1
+                continue
+            with lock:
+                latencies[bool(hit)].append(elapsed)
+
+    sampler = RssSampler()
+    sampler.start()
+    start = time.perf_counter()
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - start
+
+    return {
+        'miss_latencies': np.array(latencies[False]),
+        'hit_latencies': np.array(latencies[True]),
+        'errors': errors[0],
+        'wall': wall,
+        'peak_rss_mb': sampler.stop()
+    }
+
+
+def scoring_session_factory(store):
+    def make_session():
+        cache = {}
+
+        def analyze(state, city):
+            start = time.perf_counter()
+            if (state, city) in cache:
+                return True, time.perf_counter() - start
+            history = store.history(state, city)
+            analysis = analyze_price(history)
+            weather_risk = analyze_weather_risk(history)
+            cache[(state, city)] = {
+                'analysis': analysis,
+                'price_chart': create_price_chart(analysis['current_price'], analysis['predicted_price'])
+                if analysis else None,
+                'weather_risk': weather_risk,
+                'recommendation': get_investment_recommendation(analysis, weather_risk)
+                if analysis and weather_risk else None
+            }
+            return False, time.perf_counter() - start
+        return analyze
+    return make_session
+
+
+def app_session_factory(app_path, timeout):
+    from streamlit.testing.v1 import AppTest
+
+    def make_session():
+        app = AppTest.from_file(app_path, default_timeout=timeout)
+        app.run()
+
+        def analyze(state, city):
+            app.selectbox(key='state_select').select(state).run()
+            app.selectbox(key='city_select').select(city).run()
+            hit = (state, city) in app.session_state['analysis_cache'] \
+                if 'analysis_cache' in app.session_state else False
+            # Only the rerun that renders the analysis goes into the latency
+            # (the selection reruns above are not timed)
+            start = time.perf_counter()
+            app.button(key='generate_btn').click().run()
+            elapsed = time.perf_counter() - start
+            if app.exception:
+                raise RuntimeError(app.exception[0].message)
+            return hit, elapsed
+        return analyze
+    return make_session
+
+
+def report(concurrency, result):
+    # Hits are served from the session cache in microseconds; mixing them
+    # into one distribution would mostly measure the hot-city share
+    misses = result['miss_latencies'] * 1000
+    hits = result['hit_latencies'] * 1000
+    count = len(misses) + len(hits)
+    miss_p50, miss_p95, miss_p99 = np.percentile(misses, [50, 95, 99]) if len(misses) else (0, 0, 0)
+    hit_p50, hit_p99 = np.percentile(hits, [50, 99]) if len(hits) else (0, 0)
+    return {
+        'concurrency': concurrency,
+        'requests': count,
+        'req/s': count / result['wall'] if result['wall'] else 0,
+        'miss p50 ms': miss_p50,
+        'miss p95 ms': miss_p95,
+        'miss p99 ms': miss_p99,
+        'hit p50 ms': hit_p50,
+        'hit p99 ms': hit_p99,
+        'peak RSS MB': result['peak_rss_mb'],
+        'cache hit %': 100 * len(hits) / count if count else 0,
+        'errors': result['errors']
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--mode', choices=['scoring', 'app'], default='scoring')
+    parser.add_argument('--data', default='filled_redfin_noaa_data.csv', help="Merged Redfin/NOAA dataset")
+    parser.add_argument('--cities', default='unique_states_cities.csv', help="STATE, CITY list for the mix")
+    parser.add_argument('--app', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), 'ClimateWiseRealEstate.py'),
+                        help="Streamlit app for --mode app")
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4, 16], help="Concurrent sessions")
+    parser.add_argument('--requests', type=int, default=1000, help="Requests per concurrency level")
+    parser.add_argument('--hot-cities', type=int, default=20, help="Number of hot cities")
+    parser.add_argument('--hot-share', type=float, default=0.6, help="Share of requests going to hot cities")
+    parser.add_argument('--timeout', type=float, default=60, help="AppTest rerun timeout (seconds)")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    cities = pd.read_csv(args.cities, keep_default_na=False)
+    cities['STATE'] = cities['STATE'].str.upper().str.strip()
+    cities['CITY'] = cities['CITY'].str.title().str.strip()
+
+    if args.mode == 'scoring':
+        store = CityTimeSeriesStore.from_dataset(SharedDataset.from_csv(args.data))
+        make_session = scoring_session_factory(store)
+    else:
+        # The app loads its data relative to the working directory
+        SharedDataset.from_csv(args.data)
+        make_session = app_session_factory(os.path.abspath(args.app), args.timeout)
+
+    print(f"Mode: {args.mode} · {len(cities)} cities · {args.hot_cities} hot cities take "
+          f"{args.hot_share:.0%} of {args.requests} requests per level · "
+          f"baseline RSS {psutil.Process().memory_info().rss / 1024 ** 2:.0f} MB\n")
+
+    rows = []
+    for level, concurrency in enumerate(args.concurrency):
+        mix = city_mix(cities, args.requests, args.hot_cities, args.hot_share, args.seed + level)
+        rows.append(report(concurrency, run_sessions(mix, concurrency, make_session)))
+        print(f"concurrency {concurrency}: done", file=sys.stderr)
+
+    print(pd.DataFrame(rows).to_string(index=False, float_format='{:.2f}'.format))
+
+
+if __name__ == '__main__':
+    main()
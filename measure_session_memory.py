@@ -0,0 +1,116 @@
+"""
+Measure process RSS as simulated Streamlit sessions pile up.
+
+  copy    - what @st.cache_data did: every session gets its own unpickled
+            copy of the full DataFrame
+  shared  - what @st.cache_resource + SharedDataset does: every session
+            reads the same memory-mapped Arrow table
+
+Each (mode, sessions) pair runs in a fresh interpreter so the numbers do
+not leak into one another.
+
+    python measure_session_memory.py --data filled_redfin_noaa_data.csv
+    python measure_session_memory.py --rows 500000   # synthetic dataset
+"""
+import argparse
+import os
+import pickle
+import random
+import subprocess
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+import psutil
+
+from data_store import SharedDataset
+
+SESSION_COUNTS = [1, 10, 50]
+
+
+def rss_mb():
+    return psutil.Process().memory_info().rss / 1024 ** 2
+
+
+def write_synthetic_data(path, rows):
+    """Merged-dataset lookalike built from the cities in unique_states_cities.csv."""
+    cities = pd.read_csv('unique_states_cities.csv')
+    rng = np.random.default_rng(0)
+    picks = cities.iloc[rng.integers(0, len(cities), rows)].reset_index(drop=True)
+    df = pd.DataFrame({
+        'STATE': picks['STATE'],
+        'CITY': picks['CITY'],
+        'PERIOD_BEGIN': pd.Timestamp('2022-05-01') + pd.to_timedelta(rng.integers(0, 36, rows) * 30, 'D'),
+        'MEDIAN_SALE_PRICE': rng.normal(350000, 90000, rows).round(),
+        'INVENTORY': rng.integers(0, 300, rows),
+        'HOMES_SOLD': rng.integers(0, 120, rows),
+        'avg_temp': rng.normal(65, 12, rows).round(1),
+        'precipitation': rng.gamma(2, 20, rows).round(2),
+        'humidity': rng.normal(65, 8, rows).round(1),
+        'wind_speed': rng.normal(10, 2, rows).round(1),
+        'pressure': rng.normal(1013, 2, rows).round(1),
+        'natural_disaster_score': rng.integers(0, 30, rows),
+        'fema_disaster_count': rng.integers(0, 50, rows)
+    })
+    df.to_csv(path, index=False)
+
+
+def run_child(mode, sessions, data_path):
+    before = rss_mb()
+    keys = None
+    if mode == 'copy':
+        cached = pd.read_csv(data_path)
+        cached['STATE'] = cached['STATE'].str.upper().str.strip()
+        cached['CITY'] = cached['CITY'].str.title().str.strip()
+        keys = cached[['STATE', 'CITY']].drop_duplicates().values.tolist()
+        blob = pickle.dumps(cached)
+        del cached
+        session_state = [pickle.loads(blob) for _ in range(sessions)]
+        del blob
+        for frame in session_state:
+            state, city = random.choice(keys)
+            frame[(frame['STATE'] == state) & (frame['CITY'] == city)]
+    else:
+        dataset = SharedDataset.from_csv(data_path)
+        keys = list(dataset.offsets)
+        session_state = []
+        for _ in range(sessions):
+            state, city = random.choice(keys)
+            session_state.append({'dataset': dataset, 'location': dataset.location_frame(state, city)})
+    print(f"{rss_mb() - before:.1f} {rss_mb():.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--data', default=None, help="Merged dataset CSV (default: synthetic)")
+    parser.add_argument('--rows', type=int, default=200000, help="Rows of synthetic data to generate")
+    parser.add_argument('--child', nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child[0], int(args.child[1]), args.data)
+        return
+
+    data_path = args.data
+    if data_path is None:
+        data_path = os.path.join(tempfile.mkdtemp(), 'synthetic_redfin_noaa_data.csv')
+        write_synthetic_data(data_path, args.rows)
+    SharedDataset.from_csv(data_path)  # build the Arrow copy outside the measurements
+    print(f"Dataset: {data_path} ({os.path.getsize(data_path) / 1024 ** 2:.1f} MB CSV)\n")
+
+    print(f"{'sessions':>8} | {'copy: +RSS MB':>14} | {'shared: +RSS MB':>16}")
+    print('-' * 46)
+    for sessions in SESSION_COUNTS:
+        row = []
+        for mode in ['copy', 'shared']:
+            out = subprocess.run(
+                [sys.executable, __file__, '--data', data_path, '--child', mode, str(sessions)],
+                capture_output=True, text=True, check=True
+            ).stdout.split()
+            row.append(float(out[0]))
+        print(f"{sessions:>8} | {row[0]:>14.1f} | {row[1]:>16.1f}")
+
+
+if __name__ == '__main__':
+    main()
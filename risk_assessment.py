@@ -3,15 +3,28 @@ import numpy as np
 from datetime import datetime
 import plotly.graph_objects as go
 
+from disaster_index import state_code
+
+# Weights of the unweighted component scores in the overall climate risk
+CLIMATE_RISK_WEIGHTS = {'disaster': 0.4, 'climate': 0.3, 'vulnerability': 0.3}
+
+# Trace colors when several locations share one chart
+COMPARISON_COLORS = ['#2563eb', '#dc2626', '#059669', '#ea580c', '#4f46e5', '#0891b2', '#ca8a04', '#4b5563']
+
 class RiskAssessment:
-    def _init_(self, fema_df, merged_df):
+    def __init__(self, fema_df, merged_df, area_index=None):
         self.fema_df = fema_df
         self.merged_df = merged_df
+        # Optional DisasterAreaIndex; when present, history is city-level
+        self.area_index = area_index
 
     def get_disaster_history(self, state, city, years=5):
         try:
+            if self.area_index is not None:
+                return self.area_index.history(state, city, years)
+
             disasters = self.fema_df[
-                (self.fema_df['STATE'].str.upper() == state.upper())
+                (self.fema_df['STATE'].map(state_code) == state_code(state))
             ].copy()
             
             disasters['declarationdate'] = pd.to_datetime(disasters['declarationdate'], errors='coerce')
@@ -36,16 +49,39 @@ class RiskAssessment:
                 'most_frequent': None
             }
 
-    def get_climate_risk_score(self, state, city):
+    def get_risk_components(self, state, city):
+        """
+        Unweighted 0-100 disaster, climate and vulnerability scores. `state`
+        may be a full name (as in the merged dataset) or a two-letter code;
+        the climate and vulnerability rules are written against codes.
+        """
+        state = state_code(state)
+        if self.area_index is not None:
+            cutoff = datetime.now() - pd.DateOffset(years=5)
+            total_disasters = self.area_index.count_since(state, city, cutoff)
+        else:
+            total_disasters = self.get_disaster_history(state, city)['total_disasters']
+        climate_data = self._get_simulated_climate_data(state)
+
+        return {
+            'disaster': min(total_disasters * 5, 100),
+            'climate': self._calculate_climate_severity_score(climate_data),
+            'vulnerability': self._calculate_vulnerability_score(state, city)
+        }
+
+    def get_climate_risk_score(self, state, city, weights=None):
         try:
-            disaster_data = self.get_disaster_history(state, city)
-            climate_data = self._get_simulated_climate_data(state)
+            weights = weights or CLIMATE_RISK_WEIGHTS
+            components = self.get_risk_components(state, city)
+            disaster_score = components['disaster']
+            climate_score = components['climate']
+            vulnerability_score = components['vulnerability']
             
-            disaster_score = min(disaster_data['total_disasters'] * 5, 100)
-            climate_score = self._calculate_climate_severity_score(climate_data)
-            vulnerability_score = self._calculate_vulnerability_score(state, city)
-            
-            overall_score = (0.4 * disaster_score) + (0.3 * climate_score) + (0.3 * vulnerability_score)
+            overall_score = (
+                weights['disaster'] * disaster_score +
+                weights['climate'] * climate_score +
+                weights['vulnerability'] * vulnerability_score
+            )
             
             return {
                 'overall_score': round(overall_score, 1),
@@ -101,29 +137,49 @@ class RiskAssessment:
         else:
             return {'level': 'HIGH', 'action': 'Wait', 'description': 'High risk area', 'color': '#dc2626'}
 
-    def create_risk_visualization(self, risk_data):
+    def create_risk_visualization(self, risk_data, names=None):
+        """
+        Radar chart of the climate, disaster and vulnerability scores. Pass a
+        list of risk_data dicts (with matching names) to overlay several
+        locations on one chart.
+        """
         try:
             fig = go.Figure()
-            fig.add_trace(go.Scatterpolar(
-                r=[
-                    risk_data['climate_score'],
-                    risk_data['disaster_score'],
-                    risk_data['vulnerability_score']
-                ],
-                theta=['Climate Risk', 'Disaster Risk', 'Vulnerability'],
-                fill='toself',
-                name='Risk Profile',
-                line_color='#2563eb',
-                fillcolor='rgba(37, 99, 235, 0.2)'
-            ))
+            if isinstance(risk_data, dict):
+                fig.add_trace(go.Scatterpolar(
+                    r=[
+                        risk_data['climate_score'],
+                        risk_data['disaster_score'],
+                        risk_data['vulnerability_score']
+                    ],
+                    theta=['Climate Risk', 'Disaster Risk', 'Vulnerability'],
+                    fill='toself',
+                    name='Risk Profile',
+                    line_color='#2563eb',
+                    fillcolor='rgba(37, 99, 235, 0.2)'
+                ))
+                title = f'Risk Profile (Score: {risk_data["overall_score"]}%)'
+            else:
+                names = names or [f'Location {i + 1}' for i in range(len(risk_data))]
+                for i, (name, data) in enumerate(zip(names, risk_data)):
+                    color = COMPARISON_COLORS[i % len(COMPARISON_COLORS)]
+                    fig.add_trace(go.Scatterpolar(
+                        r=[data['climate_score'], data['disaster_score'], data['vulnerability_score']],
+                        theta=['Climate Risk', 'Disaster Risk', 'Vulnerability'],
+                        fill='toself',
+                        name=f'{name} ({data["overall_score"]}%)',
+                        line_color=color,
+                        opacity=0.6
+                    ))
+                title = 'Risk Profile Comparison'
             fig.update_layout(
                 polar=dict(
                     radialaxis=dict(visible=True, range=[0, 100], ticksuffix='%')
                 ),
-                title=f'Risk Profile (Score: {risk_data["overall_score"]}%)',
+                title=title,
                 height=400
             )
             return fig
         except Exception as e:
             print(f"Error creating visualization: {str(e)}")
-            return go.Figure()
\ No newline at end of file
+            return go.Figure()
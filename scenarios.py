@@ -0,0 +1,232 @@
+"""
+What-if reweighting of risk components for every city.
+
+ScenarioModel caches each city's unweighted component scores once:
+
+  weather    N x 5 matrix of weather risk components in [0, 1]
+             (precipitation, humidity, natural_disaster, fema, climate),
+             so weather_risk = components @ caps
+  climate    N x 3 matrix of 0-100 disaster / climate / vulnerability
+             scores, so climate_risk = components @ weights
+
+plus price_change and current_price. Rescoring all cities under new caps
+or weights is a matrix-vector product, a clip and the vectorised
+recommendation thresholds, with the baseline kept alongside for comparison.
+
+    python scenarios.py --cap humidity=10 --weight disaster=0.6
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from data_store import SharedDataset
+from data_versions import refresh_city_cache
+from disaster_index import DisasterAreaIndex, state_code
+from risk_assessment import CLIMATE_RISK_WEIGHTS, RiskAssessment
+from scoring import WEATHER_RISK_CAPS, analyze_price, get_investment_scores, weather_risk_components
+from timeseries_store import CityTimeSeriesStore
+
+WEATHER_COMPONENTS = list(WEATHER_RISK_CAPS)
+CLIMATE_COMPONENTS = list(CLIMATE_RISK_WEIGHTS)
+WEATHER_COLUMNS = ['precipitation', 'avg_temp', 'humidity', 'natural_disaster_score', 'fema_disaster_count']
+COMPONENTS_FILE = 'scenario_components.npz'
+# Bumped when cached components are computed differently; older caches are rebuilt
+COMPONENTS_FORMAT = 2
+
+
+def risk_levels(scores):
+    """Vectorised RiskAssessment._get_risk_recommendation levels."""
+    return np.select([scores < 30, scores < 60], ['LOW', 'MODERATE'], 'HIGH')
+
+
+def build_components(store, risk_assessment=None, states=None):
+    """
+    Component arrays keyed by name, aligned with 'STATE' and 'CITY'
+    (only `states`, as codes, if given). 'climate' stays empty without a
+    RiskAssessment.
+    """
+    location_states, location_cities, weather, climate, price_change, current_price = [], [], [], [], [], []
+    for state, city, history in store.iter_cities():
+        if states is not None and state_code(state) not in states:
+            continue
+        price_analysis = analyze_price(history)
+        if price_analysis is None:
+            continue
+        risk_factors = {name: history[name][-1] if name in history else 0 for name in WEATHER_COLUMNS}
+        components = weather_risk_components(risk_factors)
+
+        location_states.append(state)
+        location_cities.append(city)
+        weather.append([components[name] for name in WEATHER_COMPONENTS])
+        price_change.append(price_analysis['price_change'])
+        current_price.append(price_analysis['current_price'])
+        if risk_assessment is not None:
+            scores = risk_assessment.get_risk_components(state_code(state), city)
+            climate.append([scores[name] for name in CLIMATE_COMPONENTS])
+
+    return {
+        'STATE': np.array(location_states, dtype=object),
+        'CITY': np.array(location_cities, dtype=object),
+        'weather': np.array(weather, dtype=float).reshape(-1, len(WEATHER_COMPONENTS)),
+        'climate': np.array(climate, dtype=float).reshape(-1, len(CLIMATE_COMPONENTS)),
+        'price_change': np.array(price_change, dtype=float),
+        'current_price': np.array(current_price, dtype=float)
+    }
+
+
+def load_components(store, risk_assessment=None, versions=None):
+    """
+    Component arrays cached next to the store, rebuilt when the store is
+    newer. The cache is also rebuilt when climate components are asked for
+    but were not computed last time.
+
+    With a DataVersionManager, a stale cache is refreshed only for the
+    states whose inputs changed since the version it was built for.
+    """
+    path = os.path.join(store.store_dir, COMPONENTS_FILE)
+    manifest = os.path.join(store.store_dir, 'manifest.json')
+    cached = None
+    if os.path.exists(path):
+        with np.load(path, allow_pickle=True) as npz:
+            cached = {name: npz[name] for name in npz.files}
+        if risk_assessment is not None and len(cached['climate']) != len(cached['STATE']):
+            cached = None
+        elif cached.pop('format', None) != COMPONENTS_FORMAT:
+            cached = None
+    if cached is not None:
+        cached_version = cached.pop('data_version').item() if 'data_version' in cached else None
+        fresh = os.path.getmtime(path) >= os.path.getmtime(manifest)
+        if fresh and (versions is None or cached_version == versions.version):
+            if cached_version is not None:
+                cached['data_version'] = cached_version
+            return cached
+
+    def combine(cached, keep, fresh):
+        # 'climate' is empty (not one row per city) without a RiskAssessment
+        return {name: np.concatenate([cached[name][keep] if len(cached[name]) == len(keep) else cached[name], values])
+                for name, values in fresh.items()}
+
+    components = refresh_city_cache(
+        cached, cached_version if cached is not None else None, versions, store,
+        build=lambda states: build_components(store, risk_assessment, states),
+        combine=combine
+    )
+    components['format'] = np.array(COMPONENTS_FORMAT)
+    if versions is not None:
+        components['data_version'] = np.array(versions.version)
+    # Write under a temporary name so a half-written cache is never picked up
+    tmp_path = path + '.tmp.npz'
+    np.savez(tmp_path, **components)
+    os.replace(tmp_path, path)
+    components.pop('format')
+    components.pop('data_version', None)
+    if versions is not None:
+        components['data_version'] = versions.version
+    return components
+
+
+class ScenarioModel:
+    """Baseline vs scenario scores for every city from cached component matrices."""
+
+    def __init__(self, components):
+        self.components = components
+        self.data_version = components.get('data_version')
+        self.size = len(components['STATE'])
+        self.has_climate = len(components['climate']) == self.size and self.size > 0
+        self.baseline = self.score()
+
+    @classmethod
+    def from_store(cls, store, risk_assessment=None, versions=None):
+        return cls(load_components(store, risk_assessment, versions))
+
+    def score(self, weather_caps=None, climate_weights=None):
+        """Scores for every city under the given caps/weights (defaults: the app's)."""
+        caps = {**WEATHER_RISK_CAPS, **(weather_caps or {})}
+        cap_vector = np.array([caps[name] for name in WEATHER_COMPONENTS], dtype=float)
+        weather_risk = np.clip(self.components['weather'] @ cap_vector, 0, 100)
+        investment_score, recommendation = get_investment_scores(
+            self.components['price_change'], self.components['current_price'], weather_risk
+        )
+        scores = {
+            'weather_risk': weather_risk,
+            'investment_score': investment_score,
+            'recommendation': recommendation
+        }
+
+        if self.has_climate:
+            weights = {**CLIMATE_RISK_WEIGHTS, **(climate_weights or {})}
+            weight_vector = np.array([weights[name] for name in CLIMATE_COMPONENTS], dtype=float)
+            climate_risk = np.clip(self.components['climate'] @ weight_vector, 0, 100)
+            scores['climate_risk'] = climate_risk
+            scores['risk_level'] = risk_levels(climate_risk)
+        return scores
+
+    def rescore(self, weather_caps=None, climate_weights=None):
+        """
+        Rescore every city and line the result up against the baseline.
+
+        Returns:
+            DataFrame with one row per city: STATE, CITY, then baseline_<x>
+            and scenario_<x> for each score, plus recommendation_changed /
+            risk_level_changed flags. attrs['data_version'] holds the data
+            version the components were built from.
+        """
+        scenario = self.score(weather_caps, climate_weights)
+        result = {'STATE': self.components['STATE'], 'CITY': self.components['CITY']}
+        for name in scenario:
+            result[f'baseline_{name}'] = self.baseline[name]
+            result[f'scenario_{name}'] = scenario[name]
+        result['recommendation_changed'] = scenario['recommendation'] != self.baseline['recommendation']
+        if self.has_climate:
+            result['risk_level_changed'] = scenario['risk_level'] != self.baseline['risk_level']
+        result = pd.DataFrame(result)
+        result.attrs['data_version'] = self.data_version
+        return result
+
+    @staticmethod
+    def tier_changes(result, tier='recommendation'):
+        """Baseline x scenario counts of a tier column (recommendation or risk_level)."""
+        return pd.crosstab(result[f'baseline_{tier}'], result[f'scenario_{tier}'],
+                           rownames=['baseline'], colnames=['scenario'])
+
+
+def parse_setting(expression):
+    """'humidity=10' -> ('humidity', 10.0)"""
+    name, _, value = expression.partition('=')
+    try:
+        return name.strip(), float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Cannot parse setting: {expression}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--data', default='filled_redfin_noaa_data.csv', help="Merged Redfin/NOAA dataset")
+    parser.add_argument('--area-index', default='disaster_area_index.pkl',
+                        help="Precomputed DisasterAreaIndex (climate risk is skipped if missing)")
+    parser.add_argument('--cap', action='append', type=parse_setting, default=[],
+                        help=f"Weather risk cap, e.g. humidity=10 ({', '.join(WEATHER_COMPONENTS)})")
+    parser.add_argument('--weight', action='append', type=parse_setting, default=[],
+                        help=f"Climate risk weight, e.g. disaster=0.6 ({', '.join(CLIMATE_COMPONENTS)})")
+    args = parser.parse_args()
+
+    store = CityTimeSeriesStore.from_dataset(SharedDataset.from_csv(args.data))
+    risk_assessment = None
+    area_index = DisasterAreaIndex.load(args.area_index) if os.path.exists(args.area_index) else None
+    if area_index is not None:
+        risk_assessment = RiskAssessment(None, None, area_index=area_index)
+    model = ScenarioModel.from_store(store, risk_assessment)
+
+    start = time.perf_counter()
+    result = model.rescore(dict(args.cap), dict(args.weight))
+    elapsed = (time.perf_counter() - start) * 1000
+
+    print(ScenarioModel.tier_changes(result).to_string())
+    if model.has_climate:
+        print()
+        print(ScenarioModel.tier_changes(result, 'risk_level').to_string())
+    print(f"\n{result['recommendation_changed'].sum()} of {model.size} recommendations changed; "
+          f"rescored in {elapsed:.1f} ms")
@@ -0,0 +1,223 @@
+"""
+Score a list of locations offline, without Streamlit.
+
+Reads a CSV or Parquet file with STATE and CITY columns in chunks and
+spreads the chunks over a process pool. The FEMA area index is loaded (or
+built) once and handed to every worker, which also opens the memory-mapped
+per-city time-series store once, then computes the same price analysis,
+weather risk, climate risk score and recommendation as the dashboard.
+Without FEMA data the climate risk columns are left empty. Results are
+appended to the output CSV as chunks finish. Each output row carries the
+input `row_id`, so an interrupted run picks up where it stopped when
+started again with the same arguments.
+
+    python score_locations.py locations.csv scores.csv --workers 8
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import pandas as pd
+
+from data_store import SharedDataset
+from data_versions import DATA_INPUTS, DataVersionManager
+from disaster_index import DisasterAreaIndex, load_crosswalk
+from risk_assessment import RiskAssessment
+from scoring import analyze_price, analyze_weather_risk, get_investment_recommendation
+from timeseries_store import CityTimeSeriesStore
+
+OUTPUT_COLUMNS = [
+    'row_id', 'STATE', 'CITY', 'status',
+    'current_price', 'predicted_price', 'price_change',
+    'weather_risk', 'investment_score', 'recommendation',
+    'climate_risk_score', 'disaster_score', 'climate_score', 'vulnerability_score', 'risk_level',
+    'data_version'
+]
+
+CLI_MANIFEST = 'score_locations_versions.json'
+
+# Per-process state, filled in once by _init_worker
+_store = None
+_risk_assessment = None
+_data_version = None
+
+
+def _init_worker(data_path, area_index, data_version):
+    global _store, _risk_assessment, _data_version
+    _data_version = data_version
+    _store = CityTimeSeriesStore.from_dataset(SharedDataset.from_csv(data_path))
+    _risk_assessment = RiskAssessment(None, None, area_index=area_index) if area_index is not None else None
+
+
+def load_area_index(index_path, fema_path, store):
+    """
+    The FEMA area index, loaded or built once in the parent process.
+    None when neither the index nor the FEMA data exists.
+    """
+    area_index = DisasterAreaIndex.load(index_path) if index_path and os.path.exists(index_path) else None
+    if area_index is not None:
+        return area_index
+    if os.path.exists(fema_path):
+        return DisasterAreaIndex.build(pd.read_csv(fema_path), store.cities[['STATE', 'CITY']], load_crosswalk())
+    print(f"No {index_path} or {fema_path}: climate risk columns will be left empty", file=sys.stderr)
+    return None
+
+
+def score_location(state, city):
+    location_data = _store.history(state, city)
+    price_analysis = analyze_price(location_data)
+    weather_risk = analyze_weather_risk(location_data)
+    if price_analysis is None or weather_risk is None:
+        return {'status': 'no_data'}
+
+    recommendation = get_investment_recommendation(price_analysis, weather_risk)
+    result = {
+        'status': 'ok',
+        'current_price': price_analysis['current_price'],
+        'predicted_price': round(price_analysis['predicted_price'], 2),
+        'price_change': round(price_analysis['price_change'], 2),
+        'weather_risk': round(weather_risk['overall_risk'], 2),
+        'investment_score': recommendation['score'],
+        'recommendation': recommendation['recommendation']
+    }
+    if _risk_assessment is None:
+        return result
+    climate_risk = _risk_assessment.get_climate_risk_score(state, city)
+    return {
+        **result,
+        'climate_risk_score': climate_risk['overall_score'],
+        'disaster_score': climate_risk['disaster_score'],
+        'climate_score': climate_risk['climate_score'],
+        'vulnerability_score': climate_risk['vulnerability_score'],
+        'risk_level': climate_risk['recommendation']['level']
+    }
+
+
+def score_chunk(chunk):
+    rows = []
+    for row_id, state, city in chunk[['row_id', 'STATE', 'CITY']].itertuples(index=False):
+        try:
+            result = score_location(state, city)
+        except Exception as e:
+            print(f"Error scoring {city}, {state}: {e}", file=sys.stderr)
+            result = {'status': 'error'}
+        rows.append({'row_id': row_id, 'STATE': state, 'CITY': city, **result, 'data_version': _data_version})
+    return pd.DataFrame(rows, columns=OUTPUT_COLUMNS)
+
+
+def read_locations(path, chunk_size):
+    """Yield DataFrame chunks of STATE/CITY with a running row_id."""
+    if path.endswith('.parquet'):
+        import pyarrow.parquet as pq
+        batches = (batch.to_pandas() for batch in
+                   pq.ParquetFile(path).iter_batches(batch_size=chunk_size, columns=['STATE', 'CITY']))
+    else:
+        batches = pd.read_csv(path, usecols=['STATE', 'CITY'], chunksize=chunk_size)
+
+    offset = 0
+    for chunk in batches:
+        chunk = chunk.reset_index(drop=True)
+        chunk.insert(0, 'row_id', range(offset, offset + len(chunk)))
+        offset += len(chunk)
+        yield chunk
+
+
+def completed_row_ids(output_path, block_size=1 << 16):
+    """Row ids already in the output, after dropping any half-written last line."""
+    if not os.path.exists(output_path) or os.path.getsize(output_path) == 0:
+        return set()
+    # Seek back from the end to the last newline instead of reading the file
+    with open(output_path, 'rb+') as f:
+        end = f.seek(0, os.SEEK_END)
+        position = end
+        keep = 0
+        while position > 0:
+            start = max(0, position - block_size)
+            f.seek(start)
+            newline = f.read(position - start).rfind(b'\n')
+            if newline != -1:
+                keep = start + newline + 1
+                break
+            position = start
+        if keep < end:
+            f.truncate(keep)
+    if keep == 0:
+        return set()
+    return set(pd.read_csv(output_path, usecols=['row_id'])['row_id'])
+
+
+def run(args):
+    if args.restart and os.path.exists(args.output):
+        os.remove(args.output)
+    done = completed_row_ids(args.output)
+    if done:
+        print(f"Resuming: {len(done)} rows already scored in {args.output}", file=sys.stderr)
+
+    # Build the Arrow copy, time-series store and FEMA area index once up
+    # front rather than racing to build them in every worker
+    store = CityTimeSeriesStore.from_dataset(SharedDataset.from_csv(args.data))
+    area_index = load_area_index(args.area_index, args.fema, store)
+    # Versions are content hashes, so a separate manifest gives the same id
+    # for the same files without touching the app's data_versions.json
+    data_version = DataVersionManager({**DATA_INPUTS, 'merged': (args.data, 'STATE'), 'fema': (args.fema, 'state')},
+                                      manifest_path=CLI_MANIFEST).version
+    print(f"Data version {data_version}", file=sys.stderr)
+
+    write_header = not os.path.exists(args.output) or os.path.getsize(args.output) == 0
+    scored = 0
+    start = time.time()
+    max_in_flight = args.workers * 2
+
+    with open(args.output, 'a', newline='') as out, ProcessPoolExecutor(
+        max_workers=args.workers,
+        initializer=_init_worker,
+        initargs=(args.data, area_index, data_version)
+    ) as pool:
+        def drain(pending, until):
+            nonlocal scored, write_header
+            while len(pending) > until:
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    result = future.result()
+                    result.to_csv(out, header=write_header, index=False)
+                    out.flush()
+                    write_header = False
+                    scored += len(result)
+                    elapsed = time.time() - start
+                    print(f"\rScored {scored} rows in {elapsed:.1f}s ({scored / elapsed:.0f} rows/s)",
+                          end='', file=sys.stderr)
+            return pending
+
+        pending = set()
+        for chunk in read_locations(args.input, args.chunk_size):
+            if done:
+                chunk = chunk[~chunk['row_id'].isin(done)]
+            if chunk.empty:
+                continue
+            pending.add(pool.submit(score_chunk, chunk))
+            pending = drain(pending, max_in_flight)
+        drain(pending, 0)
+
+    elapsed = time.time() - start
+    print(f"\nDone: {scored} rows with {args.workers} workers in {elapsed:.1f}s "
+          f"({scored / elapsed if elapsed else 0:.0f} rows/s)", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('input', help="CSV or Parquet file with STATE and CITY columns")
+    parser.add_argument('output', help="Output CSV (appended to when resuming)")
+    parser.add_argument('--data', default='filled_redfin_noaa_data.csv', help="Merged Redfin/NOAA dataset")
+    parser.add_argument('--fema', default='fema_cleaned.csv', help="Cleaned FEMA declarations")
+    parser.add_argument('--area-index', default='disaster_area_index.pkl',
+                        help="Precomputed DisasterAreaIndex (built from --fema if missing)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="Worker processes")
+    parser.add_argument('--chunk-size', type=int, default=500, help="Rows per task")
+    parser.add_argument('--restart', action='store_true', help="Ignore existing output and start over")
+    run(parser.parse_args())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,304 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+# Professional color palette
+COLORS = {
+    'navy': '#1a365d',
+    'blue': '#2563eb',
+    'indigo': '#4f46e5',
+    'green': '#059669',
+    'emerald': '#10b981',
+    'red': '#dc2626',
+    'orange': '#ea580c',
+    'gray': '#4b5563',
+    'lightgray': '#e5e7eb',
+    'white': '#ffffff',
+    'black': '#111827'
+}
+
+# Maximum points each weather factor can add to the 0-100 weather risk
+WEATHER_RISK_CAPS = {
+    'precipitation': 20,
+    'humidity': 30,
+    'natural_disaster': 20,
+    'fema': 15,
+    'climate': 15
+}
+
+
+def weather_risk_components(risk_factors):
+    """
+    Unweighted weather risk components, each capped at 1.0. The weather
+    risk is sum(cap * component) over WEATHER_RISK_CAPS.
+    """
+    return {
+        'precipitation': min(risk_factors['precipitation'] / 1500, 1),
+        'humidity': min(risk_factors['humidity'] / 100, 1),
+        'natural_disaster': min(risk_factors['natural_disaster_score'] / 30, 1),
+        'fema': min(risk_factors['fema_disaster_count'] / 50, 1),
+        'climate': min(1 - (abs(risk_factors['avg_temp'] - 70) / 40), 1)
+    }
+
+
+def _column(location_data, name):
+    return np.asarray(location_data[name]) if name in location_data else None
+
+
+def _is_empty(location_data):
+    if location_data is None:
+        return True
+    if isinstance(location_data, dict):
+        return len(next(iter(location_data.values()), [])) == 0
+    return location_data.empty
+
+
+# Price analysis from one location's history. Accepts either a DataFrame of
+# the location's rows or the {column: array} view from CityTimeSeriesStore.
+def analyze_price(location_data):
+    if _is_empty(location_data):
+        return None
+
+    # Take only the 10 most recent entries for this location
+    dates = pd.to_datetime(_column(location_data, 'PERIOD_BEGIN')).to_numpy(dtype='datetime64[ns]')
+    recent = np.argsort(dates, kind='stable')[::-1][:10]
+    dates = dates[recent]
+    prices = _column(location_data, 'MEDIAN_SALE_PRICE').astype(float)[recent]
+
+    # Current price
+    current_price = prices[0]
+
+    # Simple prediction based on historical data for this location
+    if len(prices) > 1:
+        # Calculate average growth rate from available data
+        with np.errstate(divide='ignore', invalid='ignore'):
+            price_changes = prices[1:] / prices[:-1] - 1
+        price_changes = price_changes[~np.isnan(price_changes)]
+        if price_changes.size:
+            annual_growth_rate = price_changes.mean() * 12
+        else:
+            annual_growth_rate = 0.03  # Default 3% growth
+    else:
+        annual_growth_rate = 0.03  # Default 3% growth
+
+    # Predict price for 12 months out
+    predicted_price = current_price * (1 + annual_growth_rate)
+
+    # Calculate percentage change
+    price_change = ((predicted_price - current_price) / current_price) * 100
+
+    return {
+        'current_price': current_price,
+        'predicted_price': predicted_price,
+        'price_change': price_change,
+        'data_date': pd.Timestamp(dates[0])
+    }
+
+
+# Weather risk assessment from one location's history (DataFrame or
+# {column: array} view)
+def analyze_weather_risk(location_data):
+    if _is_empty(location_data):
+        return None
+
+    # Get the most recent weather data
+    def recent(name):
+        values = _column(location_data, name)
+        return values[-1] if values is not None else 0
+
+    # Calculate weather risk score
+    risk_factors = {
+        'precipitation': recent('precipitation'),
+        'avg_temp': recent('avg_temp'),  # Average temperature
+        'humidity': recent('humidity'),  # Humidity level
+        'wind_speed': recent('wind_speed'),  # Wind speed
+        'pressure': recent('pressure'),  # Atmospheric pressure
+        'natural_disaster_score': recent('natural_disaster_score'),
+        'fema_disaster_count': recent('fema_disaster_count')
+    }
+
+    # Calculate overall risk score (0-100)
+    components = weather_risk_components(risk_factors)
+    overall_risk = sum(WEATHER_RISK_CAPS[name] * components[name] for name in WEATHER_RISK_CAPS)
+
+    return {
+        'precipitation': risk_factors['precipitation'],
+        'natural_disaster_score': risk_factors['natural_disaster_score'],
+        'fema_disaster_count': risk_factors['fema_disaster_count'],
+        'avg_temp': risk_factors['avg_temp'],
+        'humidity': risk_factors['humidity'],
+        'wind_speed': risk_factors['wind_speed'],
+        'overall_risk': overall_risk
+    }
+
+
+# Function to generate investment recommendation
+def get_investment_recommendation(price_analysis, weather_risk):
+    score = 0
+    factors = {}
+
+    # Price trend analysis
+    if price_analysis['price_change'] > 5:
+        score += 40
+        factors['price_trend'] = "Excellent"
+    elif price_analysis['price_change'] > 0:
+        score += 20
+        factors['price_trend'] = "Good"
+    else:
+        score -= 10
+        factors['price_trend'] = "Declining"
+
+    # Risk assessment
+    if weather_risk['overall_risk'] < 20:
+        score += 40
+        factors['weather_risk'] = "Low"
+    elif weather_risk['overall_risk'] < 40:
+        score += 20
+        factors['weather_risk'] = "Moderate"
+    elif weather_risk['overall_risk'] < 60:
+        score += 10
+        factors['weather_risk'] = "High"
+    else:
+        score -= 20
+        factors['weather_risk'] = "Very High"
+
+    # Market conditions
+    if price_analysis['current_price'] > 500000:
+        score -= 5  # Premium markets may have limited growth
+
+    # Normalize score to 0-100
+    score = max(0, min(100, score))
+
+    # Generate recommendation
+    if score >= 70:
+        recommendation = "Strong Buy"
+        recommendation_color = COLORS['green']
+        recommendation_details = "Excellent investment opportunity"
+    elif score >= 50:
+        recommendation = "Buy"
+        recommendation_color = COLORS['emerald']
+        recommendation_details = "Good investment potential"
+    elif score >= 30:
+        recommendation = "Hold/Wait"
+        recommendation_color = COLORS['orange']
+        recommendation_details = "Monitor market conditions"
+    else:
+        recommendation = "Don't Invest"
+        recommendation_color = COLORS['red']
+        recommendation_details = "High risk, consider alternatives"
+
+    return {
+        'score': score,
+        'recommendation': recommendation,
+        'recommendation_color': recommendation_color,
+        'recommendation_details': recommendation_details,
+        'factors': factors
+    }
+
+
+# Vectorised get_investment_recommendation: scores and labels for arrays of
+# cities at once (same thresholds as above)
+def get_investment_scores(price_change, current_price, overall_risk):
+    price_change = np.asarray(price_change, dtype=float)
+    overall_risk = np.asarray(overall_risk, dtype=float)
+
+    score = np.select([price_change > 5, price_change > 0], [40, 20], -10)
+    score = score + np.select([overall_risk < 20, overall_risk < 40, overall_risk < 60], [40, 20, 10], -20)
+    score = score - np.where(np.asarray(current_price, dtype=float) > 500000, 5, 0)
+    score = np.clip(score, 0, 100)
+
+    recommendation = np.select(
+        [score >= 70, score >= 50, score >= 30],
+        ["Strong Buy", "Buy", "Hold/Wait"],
+        "Don't Invest"
+    )
+    return score, recommendation
+
+
+def create_price_chart(current_price, predicted_price):
+    """12-month price prediction chart shown with every location analysis."""
+    current_date = datetime.now()
+    future_dates = [current_date + timedelta(days=30*i) for i in range(13)]
+    
+    # Create realistic price progression
+    price_progression = []
+    for i in range(13):
+        fluctuation = np.random.normal(0, 0.01)
+        if i == 0:
+            price_progression.append(current_price)
+        elif i == 12:
+            price_progression.append(predicted_price)
+        else:
+            linear_interpolation = current_price + (predicted_price - current_price) * (i / 12)
+            price_progression.append(linear_interpolation * (1 + fluctuation))
+    
+    fig = go.Figure()
+    
+    # Main price trend line
+    fig.add_trace(go.Scatter(
+        x=future_dates,
+        y=price_progression,
+        mode='lines+markers',
+        name='Price Prediction',
+        line=dict(color=COLORS['green'], width=3),
+        marker=dict(size=8, color=COLORS['green']),
+        fill='tozeroy',
+        fillcolor='rgba(5, 150, 105, 0.1)'
+    ))
+    
+    # Key points
+    fig.add_trace(go.Scatter(
+        x=[future_dates[0], future_dates[-1]],
+        y=[current_price, predicted_price],
+        mode='markers+text',
+        name='Key Points',
+        marker=dict(size=14, color=[COLORS['blue'], COLORS['red']], 
+                   line=dict(width=2, color='white')),
+        text=[f'Current: ${current_price:,.0f}', f'Predicted: ${predicted_price:,.0f}'],
+        textposition='top center',
+        textfont=dict(size=12, color='#374151', family="Arial"),
+        showlegend=False
+    ))
+    
+    fig.update_layout(
+        title={
+            'text': '12-Month Price Prediction',
+            'x': 0.5,
+            'xanchor': 'center',
+            'font': {'size': 24, 'family': 'Arial', 'color': '#1a365d'}
+        },
+        xaxis_title='Date',
+        yaxis_title='Price ($)',
+        plot_bgcolor='white',
+        paper_bgcolor='white',
+        hovermode='x unified',
+        height=400,
+        yaxis_tickformat='$,.0f',
+        xaxis=dict(
+            showgrid=True,
+            gridcolor='#e5e7eb',
+            zerolinecolor='#e5e7eb'
+        ),
+        yaxis=dict(
+            showgrid=True,
+            gridcolor='#e5e7eb',
+            zerolinecolor='#e5e7eb'
+        ),
+        font=dict(
+            family="Arial",
+            size=12,
+            color='#4b5563'
+        ),
+        margin=dict(l=60, r=20, t=60, b=40),
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+            xanchor="right",
+            x=1
+        )
+    )
+    
+    return fig
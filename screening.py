@@ -0,0 +1,229 @@
+"""
+Multi-criteria screening across every city.
+
+A per-city metrics table (one row per city: prices, weather risk,
+recommendation) is precomputed from the time-series store. ScreeningEngine
+keeps it as numpy columns with a sorted index per numeric metric and a
+bitmap per categorical value. A query turns every filter into a boolean
+bitmap (binary search on the sorted index for ranges, a lookup for
+equality) and intersects them. Only the matching rows are then sorted,
+with a partial sort when just the top-K page is needed.
+
+    python screening.py --state TX --state FL --where "overall_risk<30" \\
+        --where "price_change>5" --where "current_price<400000" --sort investment_score
+"""
+import argparse
+import os
+import re
+import time
+
+import numpy as np
+import pandas as pd
+
+from data_store import SharedDataset
+from data_versions import refresh_city_cache
+from disaster_index import state_code
+from scoring import analyze_price, analyze_weather_risk, get_investment_recommendation
+from timeseries_store import CityTimeSeriesStore
+
+NUMERIC_METRICS = ['current_price', 'predicted_price', 'price_change', 'overall_risk',
+                   'natural_disaster_score', 'fema_disaster_count', 'investment_score']
+CATEGORICAL_METRICS = ['STATE', 'STATE_CODE', 'recommendation']
+METRICS_FILE = 'city_metrics.csv'
+
+
+def build_city_metrics(store, states=None):
+    """One row of headline metrics per city (only `states`, as codes, if given)."""
+    rows = []
+    for state, city, history in store.iter_cities():
+        if states is not None and state_code(state) not in states:
+            continue
+        price_analysis = analyze_price(history)
+        weather_risk = analyze_weather_risk(history)
+        if price_analysis is None or weather_risk is None:
+            continue
+        recommendation = get_investment_recommendation(price_analysis, weather_risk)
+        rows.append({
+            'STATE': state,
+            'STATE_CODE': state_code(state),
+            'CITY': city,
+            'current_price': price_analysis['current_price'],
+            'predicted_price': price_analysis['predicted_price'],
+            'price_change': price_analysis['price_change'],
+            'overall_risk': weather_risk['overall_risk'],
+            'natural_disaster_score': weather_risk['natural_disaster_score'],
+            'fema_disaster_count': weather_risk['fema_disaster_count'],
+            'investment_score': recommendation['score'],
+            'recommendation': recommendation['recommendation']
+        })
+    return pd.DataFrame(rows)
+
+
+def load_city_metrics(store, versions=None):
+    """
+    Metrics table cached next to the store, rebuilt when the store is newer.
+
+    With a DataVersionManager, rows carry the data_version they were built
+    for, and a stale cache is refreshed only for the states whose merged
+    data changed since then; every other row is reused.
+    """
+    path = os.path.join(store.store_dir, METRICS_FILE)
+    manifest = os.path.join(store.store_dir, 'manifest.json')
+    cached = None
+    if os.path.exists(path):
+        cached = pd.read_csv(path, keep_default_na=False, na_values=[''], dtype={'data_version': str})
+        fresh = os.path.getmtime(path) >= os.path.getmtime(manifest)
+        if fresh and (versions is None or ('data_version' in cached and cached['data_version'].eq(versions.version).all())):
+            return cached
+
+    cached_version = cached['data_version'].iloc[0] if cached is not None and 'data_version' in cached and len(cached) \
+        else None
+    metrics = refresh_city_cache(
+        cached, cached_version, versions, store,
+        build=lambda states: build_city_metrics(store, states),
+        combine=lambda cached, keep, fresh: pd.concat([cached[keep].drop(columns='data_version'), fresh],
+                                                      ignore_index=True),
+        inputs=['merged']
+    )
+    if versions is not None:
+        metrics['data_version'] = versions.version
+    metrics.to_csv(path, index=False)
+    return metrics
+
+
+class ScreeningEngine:
+    """
+    Columnar, indexed screening over the per-city metrics table.
+
+    Filters are (column, op, value) tuples:
+        ('overall_risk', '<', 30), ('price_change', '>', 5),
+        ('current_price', 'between', (200000, 400000)),
+        ('STATE_CODE', 'in', ['TX', 'FL']), ('recommendation', '==', 'Buy')
+    """
+
+    RANGE_OPS = {'<', '<=', '>', '>=', '==', 'between'}
+
+    def __init__(self, metrics):
+        self.metrics = metrics.reset_index(drop=True)
+        self.size = len(self.metrics)
+        self.data_version = self.metrics['data_version'].iloc[0] if 'data_version' in self.metrics and self.size else None
+        self.columns = {name: self.metrics[name].to_numpy() for name in self.metrics.columns}
+
+        # Sorted index per numeric metric: row order plus the values in that order
+        self.sorted_index = {}
+        for name in NUMERIC_METRICS:
+            if name in self.columns:
+                values = self.columns[name].astype(float)
+                order = np.argsort(values, kind='stable')
+                self.sorted_index[name] = (order, values[order])
+
+        # One bitmap per distinct value of each categorical metric
+        self.bitmaps = {}
+        for name in CATEGORICAL_METRICS:
+            if name in self.columns:
+                codes, uniques = pd.factorize(self.metrics[name])
+                self.bitmaps[name] = {value: codes == i for i, value in enumerate(uniques)}
+
+    def _range_bitmap(self, column, op, value):
+        order, sorted_values = self.sorted_index[column]
+        # NaNs sort to the end and never match a range
+        valid = len(sorted_values) - np.isnan(sorted_values).sum()
+        sorted_values = sorted_values[:valid]
+        if op == 'between':
+            low, high = value
+            start, stop = np.searchsorted(sorted_values, low, 'left'), np.searchsorted(sorted_values, high, 'right')
+        elif op == '<':
+            start, stop = 0, np.searchsorted(sorted_values, value, 'left')
+        elif op == '<=':
+            start, stop = 0, np.searchsorted(sorted_values, value, 'right')
+        elif op == '>':
+            start, stop = np.searchsorted(sorted_values, value, 'right'), valid
+        elif op == '>=':
+            start, stop = np.searchsorted(sorted_values, value, 'left'), valid
+        else:  # '=='
+            start, stop = np.searchsorted(sorted_values, value, 'left'), np.searchsorted(sorted_values, value, 'right')
+        bitmap = np.zeros(self.size, dtype=bool)
+        bitmap[order[start:stop]] = True
+        return bitmap
+
+    def _equality_bitmap(self, column, values):
+        bitmap = np.zeros(self.size, dtype=bool)
+        for value in values:
+            match = self.bitmaps[column].get(value)
+            if match is not None:
+                bitmap |= match
+        return bitmap
+
+    def filter_mask(self, filters):
+        mask = np.ones(self.size, dtype=bool)
+        for column, op, value in filters:
+            if column in self.sorted_index and op in self.RANGE_OPS:
+                mask &= self._range_bitmap(column, op, value)
+            elif column in self.bitmaps and op in ('==', 'in'):
+                mask &= self._equality_bitmap(column, [value] if op == '==' else value)
+            else:
+                raise ValueError(f"Unsupported filter: {column} {op} {value!r}")
+        return mask
+
+    def query(self, filters=(), sort_by='investment_score', descending=True, limit=20, offset=0):
+        """
+        Run a screen and return one page of results.
+
+        Returns:
+            Dictionary with 'total' (number of matching cities), 'rows'
+            (DataFrame holding rows offset..offset+limit in sort order) and
+            the 'data_version' the metrics were built from
+        """
+        matches = np.flatnonzero(self.filter_mask(filters))
+        total = len(matches)
+
+        if sort_by and total:
+            keys = self.columns[sort_by].astype(float)[matches]
+            keys = np.where(np.isnan(keys), np.inf, -keys if descending else keys)
+            needed = offset + limit if limit else total
+            if needed < total:
+                # Top-K: partition first so only the requested page gets sorted
+                top = np.argpartition(keys, needed - 1)[:needed]
+                matches = matches[top[np.argsort(keys[top], kind='stable')]]
+            else:
+                matches = matches[np.argsort(keys, kind='stable')]
+
+        page = matches[offset:offset + limit] if limit else matches[offset:]
+        return {'total': total, 'rows': self.metrics.iloc[page].reset_index(drop=True), 'data_version': self.data_version}
+
+
+def parse_filter(expression):
+    """'overall_risk<30' -> ('overall_risk', '<', 30.0)"""
+    match = re.fullmatch(r'\s*(\w+)\s*(<=|>=|==|<|>)\s*(.+?)\s*', expression)
+    if not match:
+        raise argparse.ArgumentTypeError(f"Cannot parse filter: {expression}")
+    column, op, value = match.groups()
+    try:
+        value = float(value)
+    except ValueError:
+        pass
+    return column, op, value
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--data', default='filled_redfin_noaa_data.csv', help="Merged Redfin/NOAA dataset")
+    parser.add_argument('--state', action='append', default=[], help="State code or name (repeatable)")
+    parser.add_argument('--where', action='append', type=parse_filter, default=[], help="e.g. 'overall_risk<30'")
+    parser.add_argument('--sort', default='investment_score', help="Metric to sort by")
+    parser.add_argument('--ascending', action='store_true')
+    parser.add_argument('--limit', type=int, default=20)
+    parser.add_argument('--offset', type=int, default=0)
+    args = parser.parse_args()
+
+    engine = ScreeningEngine(load_city_metrics(CityTimeSeriesStore.from_dataset(SharedDataset.from_csv(args.data))))
+    filters = list(args.where)
+    if args.state:
+        filters.append(('STATE_CODE', 'in', [state_code(s) for s in args.state]))
+
+    start = time.perf_counter()
+    result = engine.query(filters, sort_by=args.sort, descending=not args.ascending,
+                          limit=args.limit, offset=args.offset)
+    elapsed = (time.perf_counter() - start) * 1000
+    print(result['rows'].to_string(index=False))
+    print(f"\n{result['total']} of {engine.size} cities matched in {elapsed:.1f} ms")
@@ -0,0 +1,134 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from data_store import normalize_location
+
+DATE_COLUMN = 'PERIOD_BEGIN'
+MANIFEST = 'manifest.json'
+CITIES = 'cities.csv'
+
+
+class CityTimeSeriesStore:
+    """
+    On-disk, memory-mapped monthly history for every city.
+
+    Each numeric column of the merged dataset is stored as one contiguous
+    .npy array, sorted by (STATE, CITY, PERIOD_BEGIN), and cities.csv maps
+    city_id -> (start, length) into those arrays. A city's history is then
+    a zero-copy slice of each mapped column, and a pass over all cities
+    reads every column front to back.
+
+    Layout of `store_dir`:
+        manifest.json   column name -> .npy file, plus the source it was built from
+        cities.csv      city_id, STATE, CITY, start, length
+        col_<i>.npy     one array per numeric column (PERIOD_BEGIN as datetime64[ns])
+    """
+
+    def __init__(self, store_dir):
+        self.store_dir = store_dir
+        with open(os.path.join(store_dir, MANIFEST)) as f:
+            self.manifest = json.load(f)
+        self.columns = {
+            name: np.load(os.path.join(store_dir, filename), mmap_mode='r')
+            for name, filename in self.manifest['columns'].items()
+        }
+        self.cities = pd.read_csv(os.path.join(store_dir, CITIES), keep_default_na=False)
+        self.offsets = {
+            (state, city): (start, length)
+            for state, city, start, length in self.cities[['STATE', 'CITY', 'start', 'length']].itertuples(index=False)
+        }
+
+    @classmethod
+    def from_dataset(cls, dataset, store_dir=None):
+        """Open the store for a SharedDataset, (re)building it if missing or stale."""
+        store_dir = store_dir or os.path.splitext(dataset.arrow_path)[0] + '_timeseries'
+        manifest_path = os.path.join(store_dir, MANIFEST)
+        if not os.path.exists(manifest_path) or os.path.getmtime(manifest_path) < os.path.getmtime(dataset.arrow_path):
+            cls.build(dataset, store_dir)
+        return cls(store_dir)
+
+    @staticmethod
+    def build(dataset, store_dir):
+        os.makedirs(store_dir, exist_ok=True)
+        table = dataset.table
+
+        # SharedDataset rows are already grouped by city, in offset order;
+        # order rows within each group by date
+        keys = list(dataset.offsets)
+        lengths = np.array([dataset.offsets[key][1] for key in keys], dtype=np.int64)
+        city_ids = np.repeat(np.arange(len(keys)), lengths)
+        dates = pd.to_datetime(table[DATE_COLUMN].to_pandas(), errors='coerce').to_numpy(dtype='datetime64[ns]')
+        order = np.lexsort((dates, city_ids))
+
+        manifest = {'source': dataset.arrow_path, 'columns': {}}
+        for i, field in enumerate(table.schema):
+            if field.name == DATE_COLUMN:
+                values = dates
+            elif pa.types.is_integer(field.type) or pa.types.is_floating(field.type):
+                values = table[field.name].to_numpy().astype(np.float64)
+            else:
+                continue
+            filename = f'col_{i}.npy'
+            # Replace rather than overwrite, so processes still mapping the
+            # old file keep reading it
+            tmp_path = os.path.join(store_dir, filename + '.tmp')
+            with open(tmp_path, 'wb') as f:
+                np.save(f, values[order])
+            os.replace(tmp_path, os.path.join(store_dir, filename))
+            manifest['columns'][field.name] = filename
+
+        pd.DataFrame({
+            'city_id': np.arange(len(keys)),
+            'STATE': [state for state, _ in keys],
+            'CITY': [city for _, city in keys],
+            'start': np.cumsum(lengths) - lengths,
+            'length': lengths
+        }).to_csv(os.path.join(store_dir, CITIES), index=False)
+
+        # Manifest last: its presence (and mtime) marks a complete build
+        with open(os.path.join(store_dir, MANIFEST), 'w') as f:
+            json.dump(manifest, f, indent=2)
+
+    def history(self, state, city, columns=None):
+        """
+        Zero-copy view of one city's history: {column: read-only array slice},
+        oldest month first. Returns None for unknown locations.
+        """
+        span = self.offsets.get(normalize_location(state, city))
+        if span is None:
+            return None
+        start, length = span
+        names = columns or self.columns.keys()
+        return {name: self.columns[name][start:start + length] for name in names}
+
+    def histories(self, locations, columns=None):
+        """
+        Batch history(): resolve many (state, city) pairs in one call.
+        Returns {(STATE, City): view or None}, in the order given.
+        """
+        names = list(columns or self.columns.keys())
+        result = {}
+        for state, city in locations:
+            key = normalize_location(state, city)
+            span = self.offsets.get(key)
+            if span is None:
+                result[key] = None
+                continue
+            start, length = span
+            result[key] = {name: self.columns[name][start:start + length] for name in names}
+        return result
+
+    def history_frame(self, state, city, columns=None):
+        """Like history(), materialised as a small DataFrame for display."""
+        history = self.history(state, city, columns)
+        return pd.DataFrame(history) if history is not None else pd.DataFrame()
+
+    def iter_cities(self, columns=None):
+        """Yield (state, city, history) for every city in storage order."""
+        names = columns or list(self.columns.keys())
+        for state, city, start, length in self.cities[['STATE', 'CITY', 'start', 'length']].itertuples(index=False):
+            yield state, city, {name: self.columns[name][start:start + length] for name in names}
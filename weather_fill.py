@@ -0,0 +1,405 @@
+"""
+Out-of-core version of the weather filling in the notebooks.
+
+fill_weather_data_simple (Weather_Analysis.ipynb) fills missing weather
+columns with month-year medians, then falls back to overall medians.
+clean_merged_data (Final_Project notebook) then fills any other numeric
+column with its median and categorical columns with their mode. Both
+need the whole merged frame in memory. This module streams the file twice:
+
+  pass 1  read in chunks and feed every value into a mergeable quantile
+          sketch, one per (YEAR, MONTH, column) and one per column
+          overall. Categorical modes come from bounded heavy-hitter
+          counters, and per city-month sums are kept if the nearest-city
+          fallback is on.
+  pass 2  read in chunks again, fill each chunk, write it out
+
+Memory depends on the number of groups, columns and sketch buckets, never
+on the number of rows. Weather-column medians come from fixed-width bins
+and are within `resolution` / 2 of the exact median; other numeric
+columns use DDSketch-style log buckets, within `relative_accuracy`.
+
+With --coords (STATE, CITY, LATITUDE, LONGITUDE), a missing value is
+first taken from the nearest city in the same state that has data for
+that month, before the month-year median.
+
+    python weather_fill.py redfin_with_fema_noaa.csv filled_redfin_noaa_data.csv
+    python weather_fill.py merged.csv filled.csv --coords city_coords.csv --chunksize 100000
+"""
+import argparse
+import math
+import time
+
+import numpy as np
+import pandas as pd
+
+from data_store import normalize_location
+
+WEATHER_COLUMNS = ['avg_temp', 'min_temp', 'max_temp', 'wind_speed',
+                   'precipitation', 'humidity', 'pressure', 'disaster_score']
+GROUP_COLUMNS = ['YEAR', 'MONTH']
+NEIGHBORS = 5
+
+
+class QuantileSketch:
+    """
+    Mergeable quantile sketch with relative-error guarantees (DDSketch).
+
+    Values are counted in logarithmic buckets: bucket i holds values in
+    (gamma^(i-1), gamma^i], so any quantile is returned within
+    `relative_accuracy` of a value of that rank. Positive and negative
+    values have separate bucket stores and near-zero values one counter.
+    """
+
+    def __init__(self, relative_accuracy=0.01, min_value=1e-9):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.min_value = min_value
+        self.positive = {}
+        self.negative = {}
+        self.zero_count = 0
+        self.count = 0
+
+    def _add_to(self, store, magnitudes):
+        indices, counts = np.unique(np.ceil(np.log(magnitudes) / self.log_gamma).astype(np.int64),
+                                    return_counts=True)
+        for index, count in zip(indices.tolist(), counts.tolist()):
+            store[index] = store.get(index, 0) + count
+
+    def add(self, values):
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        if values.size == 0:
+            return
+        self.count += values.size
+        positive = values > self.min_value
+        negative = values < -self.min_value
+        self.zero_count += int(values.size - positive.sum() - negative.sum())
+        if positive.any():
+            self._add_to(self.positive, values[positive])
+        if negative.any():
+            self._add_to(self.negative, -values[negative])
+
+    def merge(self, other):
+        for store, other_store in [(self.positive, other.positive), (self.negative, other.negative)]:
+            for index, count in other_store.items():
+                store[index] = store.get(index, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        return self
+
+    def _value(self, index):
+        return 2 * self.gamma ** index / (self.gamma + 1)
+
+    def quantile(self, q):
+        """Approximate q-quantile (0 <= q <= 1); NaN for an empty sketch."""
+        if self.count == 0:
+            return np.nan
+        rank = q * (self.count - 1)
+        seen = 0
+        for index in sorted(self.negative, reverse=True):
+            seen += self.negative[index]
+            if seen > rank:
+                return -self._value(index)
+        seen += self.zero_count
+        if seen > rank:
+            return 0.0
+        for index in sorted(self.positive):
+            seen += self.positive[index]
+            if seen > rank:
+                return self._value(index)
+        return self._value(max(self.positive))
+
+    def median(self):
+        return self.quantile(0.5)
+
+
+class BinnedQuantileSketch:
+    """
+    Mergeable quantile sketch with an absolute-error guarantee.
+
+    Values are counted in fixed-width bins: bin i holds values within
+    resolution / 2 of i * resolution, so quantiles are exact to
+    resolution / 2 however far a column sits from zero (a relative-error
+    sketch is ~20 hPa wide around 1013 hPa). Memory follows the column's
+    range / resolution, not the number of rows. Used for the weather
+    columns; the default 0.01 is the precision they are recorded at.
+    """
+
+    def __init__(self, resolution=0.01):
+        self.resolution = resolution
+        self.bins = {}
+        self.count = 0
+
+    def add(self, values):
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        if values.size == 0:
+            return
+        self.count += values.size
+        indices, counts = np.unique(np.rint(values / self.resolution).astype(np.int64), return_counts=True)
+        for index, count in zip(indices.tolist(), counts.tolist()):
+            self.bins[index] = self.bins.get(index, 0) + count
+
+    def merge(self, other):
+        for index, count in other.bins.items():
+            self.bins[index] = self.bins.get(index, 0) + count
+        self.count += other.count
+        return self
+
+    def quantile(self, q):
+        """q-quantile (0 <= q <= 1) with linear interpolation, as pandas does; NaN for an empty sketch."""
+        if self.count == 0:
+            return np.nan
+        indices = np.array(sorted(self.bins))
+        cumulative = np.cumsum([self.bins[index] for index in indices])
+        rank = q * (self.count - 1)
+        lower = indices[np.searchsorted(cumulative, math.floor(rank), side='right')]
+        upper = indices[np.searchsorted(cumulative, math.ceil(rank), side='right')]
+        value = lower + (upper - lower) * (rank - math.floor(rank))
+        return round(value * self.resolution, 10)
+
+    def median(self):
+        return self.quantile(0.5)
+
+
+class HeavyHitters:
+    """
+    Misra-Gries summary for the categorical modes: at most `capacity`
+    counters, so memory stays bounded even for a unique-per-row column.
+    Any value seen more than n / (capacity + 1) times keeps a counter, so
+    a column's real mode is found unless no value is that frequent.
+    """
+
+    def __init__(self, capacity=1000):
+        self.capacity = capacity
+        self.counters = {}
+
+    def update(self, counts):
+        for value, count in counts.items():
+            self.counters[value] = self.counters.get(value, 0) + count
+        if len(self.counters) > self.capacity:
+            cut = sorted(self.counters.values(), reverse=True)[self.capacity]
+            self.counters = {value: count - cut for value, count in self.counters.items() if count > cut}
+
+    def most_common(self):
+        return max(self.counters, key=self.counters.get) if self.counters else None
+
+
+def _with_groups(chunk):
+    """Make sure the chunk has YEAR and MONTH (derived from PERIOD_BEGIN if needed)."""
+    if all(column in chunk for column in GROUP_COLUMNS):
+        return chunk
+    dates = pd.to_datetime(chunk['PERIOD_BEGIN'], errors='coerce')
+    return chunk.assign(YEAR=dates.dt.year, MONTH=dates.dt.month)
+
+
+def _normalize_locations(chunk):
+    keys = [normalize_location(state, city) for state, city in zip(chunk['STATE'], chunk['CITY'])]
+    return pd.MultiIndex.from_tuples(keys, names=['STATE', 'CITY']) if keys else None
+
+
+def load_neighbors(coords_path, k=NEIGHBORS):
+    """
+    {(STATE, City): [up to k nearest (STATE, City) in the same state]} from a
+    coordinates file with STATE, CITY and latitude/longitude columns.
+    """
+    coords = pd.read_csv(coords_path)
+    lat = next(c for c in coords.columns if c.lower() in ('latitude', 'lat'))
+    lon = next(c for c in coords.columns if c.lower() in ('longitude', 'lon', 'lng'))
+    coords = coords.dropna(subset=[lat, lon])
+    coords['key'] = [normalize_location(state, city) for state, city in zip(coords['STATE'], coords['CITY'])]
+    coords = coords.drop_duplicates('key')
+    coords['state_key'] = [state for state, _ in coords['key']]
+
+    neighbors = {}
+    for _, group in coords.groupby('state_key'):
+        keys = group['key'].tolist()
+        phi = np.radians(group[lat].to_numpy())
+        lam = np.radians(group[lon].to_numpy())
+        # Haversine distances between every pair of cities in the state
+        dphi = phi[:, None] - phi[None, :]
+        dlam = lam[:, None] - lam[None, :]
+        distance = np.sin(dphi / 2) ** 2 + np.cos(phi[:, None]) * np.cos(phi[None, :]) * np.sin(dlam / 2) ** 2
+        np.fill_diagonal(distance, np.inf)
+        nearest = np.argsort(distance, axis=1)[:, :k]
+        for i, key in enumerate(keys):
+            neighbors[key] = [keys[j] for j in nearest[i] if np.isfinite(distance[i, j])]
+    return neighbors
+
+
+class FillStatistics:
+    """Everything pass 1 learns about the file; pass 2 fills from it."""
+
+    def __init__(self, weather_columns=None, relative_accuracy=0.01, resolution=0.01):
+        self.weather_columns = weather_columns
+        self.relative_accuracy = relative_accuracy
+        self.resolution = resolution
+        self.group_sketches = {}
+        self.column_sketches = {}
+        self.category_counts = {}
+        self.city_month = None
+        self.rows = 0
+        self.missing = {}
+
+    def _sketch(self, store, key, column):
+        if key not in store:
+            # Weather columns sit far from zero (pressure ~1013), so they need
+            # absolute error; prices and counts are fine with relative error
+            store[key] = BinnedQuantileSketch(self.resolution) if column in self.weather_columns \
+                else QuantileSketch(self.relative_accuracy)
+        return store[key]
+
+    def update(self, chunk, track_cities=False):
+        if self.weather_columns is None:
+            self.weather_columns = [column for column in WEATHER_COLUMNS if column in chunk]
+        weather_columns = self.weather_columns
+        self.rows += len(chunk)
+        for column in chunk.columns:
+            self.missing[column] = self.missing.get(column, 0) + int(chunk[column].isna().sum())
+
+        numeric = chunk.select_dtypes(include=['number']).columns
+        for column in numeric:
+            self._sketch(self.column_sketches, column, column).add(chunk[column].to_numpy())
+        for column in chunk.columns.difference(numeric):
+            self.category_counts.setdefault(column, HeavyHitters()).update(chunk[column].value_counts())
+
+        for (year, month), rows in chunk.groupby(GROUP_COLUMNS).indices.items():
+            for column in weather_columns:
+                self._sketch(self.group_sketches, (year, month, column), column).add(chunk[column].to_numpy()[rows])
+
+        if track_cities:
+            # Running per city-month sums and counts; re-aggregated every
+            # chunk so the size stays at cities x months
+            keys = _normalize_locations(chunk)
+            frame = chunk[weather_columns + GROUP_COLUMNS].copy()
+            frame['STATE'] = keys.get_level_values(0)
+            frame['CITY'] = keys.get_level_values(1)
+            grouped = frame.groupby(['STATE', 'CITY'] + GROUP_COLUMNS)[weather_columns]
+            part = pd.concat({'sum': grouped.sum(), 'count': grouped.count()}, axis=1)
+            self.city_month = part if self.city_month is None else \
+                pd.concat([self.city_month, part]).groupby(level=[0, 1, 2, 3]).sum()
+
+    def group_medians(self):
+        """DataFrame of month-year medians indexed by (YEAR, MONTH)."""
+        weather_columns = self.weather_columns
+        groups = sorted({(year, month) for year, month, _ in self.group_sketches})
+        index = pd.MultiIndex.from_tuples(groups, names=GROUP_COLUMNS)
+        return pd.DataFrame({
+            column: [self.group_sketches[(year, month, column)].median() for year, month in groups]
+            for column in weather_columns
+        }, index=index)
+
+    def column_medians(self):
+        return {column: sketch.median() for column, sketch in self.column_sketches.items()}
+
+    def modes(self):
+        return {column: counts.most_common() for column, counts in self.category_counts.items() if counts.counters}
+
+    def city_month_means(self):
+        if self.city_month is None:
+            return None
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return self.city_month['sum'] / self.city_month['count'].replace(0, np.nan)
+
+
+def collect_statistics(input_path, weather_columns=None, chunksize=200000, relative_accuracy=0.01, track_cities=False,
+                       resolution=0.01):
+    """Pass 1: stream the file and build the sketches."""
+    statistics = FillStatistics(weather_columns, relative_accuracy, resolution)
+    for chunk in pd.read_csv(input_path, chunksize=chunksize):
+        statistics.update(_with_groups(chunk), track_cities)
+    return statistics
+
+
+def fill_chunk(chunk, statistics, group_medians, column_medians, modes, neighbors=None, city_means=None,
+               clean=True):
+    """Pass 2 for one chunk: nearest city, then month-year median, then overall median / mode."""
+    chunk = _with_groups(chunk)
+    weather_columns = statistics.weather_columns
+    original_missing = chunk['avg_temp'].isna() if 'avg_temp' in chunk else None
+
+    if neighbors is not None and city_means is not None:
+        row_neighbors = [neighbors.get(key, []) for key in _normalize_locations(chunk)]
+        for k in range(NEIGHBORS):
+            # k-th nearest city for every row, looked up for the same month
+            neighbor = [near[k] if k < len(near) else (None, None) for near in row_neighbors]
+            lookup = pd.MultiIndex.from_arrays([
+                [state for state, _ in neighbor], [city for _, city in neighbor],
+                chunk['YEAR'].to_numpy(), chunk['MONTH'].to_numpy()
+            ])
+            values = city_means.reindex(lookup)
+            for column in weather_columns:
+                chunk[column] = chunk[column].fillna(pd.Series(values[column].to_numpy(), index=chunk.index))
+
+    months = pd.MultiIndex.from_frame(chunk[GROUP_COLUMNS])
+    medians = group_medians.reindex(months)
+    for column in weather_columns:
+        chunk[column] = chunk[column].fillna(pd.Series(medians[column].to_numpy(), index=chunk.index))
+        chunk[column] = chunk[column].fillna(column_medians.get(column))
+
+    if clean:
+        for column in chunk.columns:
+            if column in column_medians:
+                chunk[column] = chunk[column].fillna(column_medians[column])
+            elif column in modes:
+                chunk[column] = chunk[column].fillna(modes[column])
+            elif not pd.api.types.is_numeric_dtype(chunk[column]):
+                chunk[column] = chunk[column].fillna('Unknown')
+
+    if original_missing is not None:
+        chunk['weather_data_filled'] = original_missing
+    return chunk
+
+
+def fill_weather_file(input_path, output_path, weather_columns=None, chunksize=200000, relative_accuracy=0.01,
+                      coords_path=None, clean=True, resolution=0.01):
+    """
+    Two-pass, bounded-memory equivalent of fill_weather_data_simple followed
+    by clean_merged_data. Returns the pass-1 FillStatistics.
+    """
+    start = time.time()
+    print("Pass 1: collecting month-year sketches...")
+    statistics = collect_statistics(input_path, weather_columns, chunksize, relative_accuracy,
+                                    track_cities=coords_path is not None, resolution=resolution)
+    missing_before = {column: statistics.missing.get(column, 0) for column in statistics.weather_columns}
+    print(f"Missing values before: {missing_before}")
+
+    group_medians = statistics.group_medians()
+    column_medians = statistics.column_medians()
+    modes = statistics.modes()
+    neighbors = load_neighbors(coords_path) if coords_path else None
+    city_means = statistics.city_month_means()
+
+    print("Pass 2: filling and writing...")
+    written = 0
+    missing_after = {}
+    for i, chunk in enumerate(pd.read_csv(input_path, chunksize=chunksize)):
+        chunk = fill_chunk(chunk, statistics, group_medians, column_medians, modes, neighbors, city_means, clean)
+        for column in statistics.weather_columns:
+            missing_after[column] = missing_after.get(column, 0) + int(chunk[column].isna().sum())
+        chunk.to_csv(output_path, mode='w' if i == 0 else 'a', header=i == 0, index=False)
+        written += len(chunk)
+
+    print(f"Final missing values: {missing_after}")
+    filled = statistics.missing.get('avg_temp', 0)
+    print(f"Filled weather data for {filled} rows ({filled / max(written, 1) * 100:.2f}% of dataset)")
+    print(f"Wrote {written} rows to {output_path} in {time.time() - start:.1f}s")
+    return statistics
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('input', help="Merged Redfin/NOAA CSV with missing weather values")
+    parser.add_argument('output', help="Filled CSV to write")
+    parser.add_argument('--columns', nargs='+', default=None, help="Weather columns to fill (default: notebook list)")
+    parser.add_argument('--chunksize', type=int, default=200000, help="Rows per chunk")
+    parser.add_argument('--resolution', type=float, default=0.01, help="Absolute accuracy of the weather-column medians")
+    parser.add_argument('--accuracy', type=float, default=0.01, help="Relative accuracy of the other numeric medians")
+    parser.add_argument('--coords', default=None, help="STATE, CITY, LATITUDE, LONGITUDE file for the nearest-city fallback")
+    parser.add_argument('--no-clean', action='store_true', help="Only fill weather columns (skip clean_merged_data step)")
+    args = parser.parse_args()
+
+    fill_weather_file(args.input, args.output, args.columns, args.chunksize, args.accuracy, args.coords,
+                      clean=not args.no_clean, resolution=args.resolution)